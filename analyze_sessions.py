@@ -0,0 +1,309 @@
+"""
+Offline analytics over recorded session files (see session_log).
+
+Answers, over any number of session files (binary or JSON lines):
+- hit, rock and empty-tile press rates by difficulty
+- how often presses land on rocks, by the number of rocks in the pattern
+- average reaction time (pattern shown to stump pressed) per tile
+- sessions, scores and hit rate per venue
+
+Files are streamed one session at a time and aggregated in chunks, with
+NumPy when it is installed (pure Python otherwise); several files are
+processed in parallel by a process pool. Usage:
+
+    python analyze_sessions.py logs/ --output report/
+"""
+import argparse
+import csv
+import os
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pattern_logic import MAX_DIFFICULTY, tile_split
+from session_log import iter_sessions, PATTERN, HIT, ROCK, EMPTY
+
+CHUNK_SESSIONS = 2000  # Sessions aggregated per NumPy pass
+SESSION_SUFFIXES = (".bin", ".jsonl", ".json")
+
+
+class Totals:
+    """Additive counters of one or more files; merge() combines workers' results."""
+
+    def __init__(self):
+        self.sessions = 0
+        self.events = 0
+        # difficulty -> [patterns, presses, hits, rocks, empties]
+        self.difficulties = {}
+        # (rows, cols, tile) -> [hits, reaction ms sum]
+        self.tiles = {}
+        # venue -> [sessions, score sum, best score, hits, misses]
+        self.venues = {}
+
+    def merge(self, other):
+        self.sessions += other.sessions
+        self.events += other.events
+        for table, other_table in ((self.difficulties, other.difficulties), (self.tiles, other.tiles),
+                                   (self.venues, other.venues)):
+            for key, values in other_table.items():
+                mine = table.get(key)
+                if mine is None:
+                    table[key] = list(values)
+                elif table is self.venues:
+                    mine[0] += values[0]
+                    mine[1] += values[1]
+                    mine[2] = max(mine[2], values[2])
+                    mine[3] += values[3]
+                    mine[4] += values[4]
+                else:
+                    for i, value in enumerate(values):
+                        mine[i] += value
+        return self
+
+    def add_session_totals(self, session):
+        venue = self.venues.setdefault(session["venue"], [0, 0, session["score"], 0, 0])
+        venue[0] += 1
+        venue[1] += session["score"]
+        venue[2] = max(venue[2], session["score"])
+        venue[3] += session["hits"]
+        venue[4] += session["misses"]
+        self.sessions += 1
+        self.events += len(session["kinds"])
+
+    def add_difficulty(self, difficulty, patterns=0, presses=0, hits=0, rocks=0, empties=0):
+        row = self.difficulties.setdefault(difficulty, [0, 0, 0, 0, 0])
+        row[0] += patterns
+        row[1] += presses
+        row[2] += hits
+        row[3] += rocks
+        row[4] += empties
+
+    def add_tile(self, key, hits, reaction_ms):
+        row = self.tiles.setdefault(key, [0, 0])
+        row[0] += hits
+        row[1] += reaction_ms
+
+
+def add_session_python(totals, session):
+    """Aggregate one session's events, press by press."""
+    kinds, times, tiles, values = session["kinds"], session["times"], session["tiles"], session["values"]
+    grid = (session["rows"], session["cols"])
+    pattern_times = []
+    pattern_difficulties = []
+    for kind, t, difficulty in zip(kinds, times, values):
+        if kind == PATTERN:
+            pattern_times.append(t)
+            pattern_difficulties.append(difficulty)
+            totals.add_difficulty(difficulty, patterns=1)
+
+    for kind, t, tile in zip(kinds, times, tiles):
+        if kind == PATTERN:
+            continue
+        # A press counts against the pattern shown when it was made
+        index = bisect_right(pattern_times, t) - 1
+        if index < 0:
+            continue  # Before the first pattern
+        difficulty = pattern_difficulties[index]
+        totals.add_difficulty(difficulty, presses=1, hits=kind == HIT, rocks=kind == ROCK, empties=kind == EMPTY)
+        if kind == HIT:
+            totals.add_tile(grid + (tile,), 1, t - pattern_times[index])
+
+
+def add_chunk_numpy(totals, grid, chunk):
+    """
+    Aggregate the events of many sessions of one grid size at once.
+
+    chunk holds the sessions' concatenated columns plus the session number of
+    every event; times are made unique across sessions by putting the
+    session number in the high 32 bits, so one searchsorted finds the
+    pattern of every press.
+    """
+    kinds = np.frombuffer(chunk["kinds"], dtype=np.uint8)
+    times = np.frombuffer(chunk["times"], dtype=np.int32).astype(np.int64)
+    tiles = np.frombuffer(chunk["tiles"], dtype=np.int16)
+    values = np.frombuffer(chunk["values"], dtype=np.int16)
+    session_numbers = np.frombuffer(chunk["sessions"], dtype=np.int64)
+    keys = (session_numbers << 32) + (times + (1 << 31))
+
+    is_pattern = kinds == PATTERN
+    pattern_keys = keys[is_pattern]
+    pattern_times = times[is_pattern]
+    pattern_sessions = session_numbers[is_pattern]
+    pattern_difficulties = values[is_pattern].astype(np.int64)
+
+    size = max(MAX_DIFFICULTY, int(pattern_difficulties.max(initial=0))) + 1
+    patterns = np.bincount(pattern_difficulties, minlength=size)
+
+    press = ~is_pattern
+    index = np.searchsorted(pattern_keys, keys[press], side="right") - 1
+    valid = index >= 0
+    valid[valid] = pattern_sessions[index[valid]] == session_numbers[press][valid]  # Not before the first pattern
+    index = index[valid]
+    press_kinds = kinds[press][valid]
+    press_difficulties = pattern_difficulties[index]
+
+    counts = np.zeros((size, EMPTY + 1), dtype=np.int64)
+    np.add.at(counts, (press_difficulties, press_kinds), 1)
+    for difficulty in range(size):
+        if patterns[difficulty] or counts[difficulty].any():
+            totals.add_difficulty(
+                difficulty, patterns=int(patterns[difficulty]), presses=int(counts[difficulty].sum()),
+                hits=int(counts[difficulty, HIT]), rocks=int(counts[difficulty, ROCK]),
+                empties=int(counts[difficulty, EMPTY]),
+            )
+
+    hit = press_kinds == HIT
+    hit_tiles = tiles[press][valid][hit].astype(np.int64)
+    reactions = (times[press][valid][hit] - pattern_times[index[hit]])
+    tile_count = grid[0] * grid[1]
+    hits = np.bincount(hit_tiles, minlength=tile_count)
+    reaction_sums = np.bincount(hit_tiles, weights=reactions, minlength=tile_count)
+    for tile in np.flatnonzero(hits):
+        totals.add_tile(grid + (int(tile),), int(hits[tile]), int(reaction_sums[tile]))
+
+
+def analyze_file(path, venue=None, use_numpy=True):
+    """Aggregate one session file (run in a worker process)."""
+    totals = Totals()
+    use_numpy = use_numpy and np is not None
+    chunks = {}  # (rows, cols) -> concatenated columns
+
+    def flush(grid):
+        chunk = chunks.pop(grid)
+        if chunk["count"]:
+            add_chunk_numpy(totals, grid, chunk)
+
+    for session in iter_sessions(path):
+        if venue is not None and session["venue"] != venue:
+            continue
+        totals.add_session_totals(session)
+        if not use_numpy:
+            add_session_python(totals, session)
+            continue
+        grid = (session["rows"], session["cols"])
+        chunk = chunks.get(grid)
+        if chunk is None:
+            chunk = chunks[grid] = {"kinds": bytearray(), "times": bytearray(), "tiles": bytearray(),
+                                    "values": bytearray(), "sessions": bytearray(), "count": 0}
+        for name in ("kinds", "times", "tiles", "values"):
+            chunk[name] += session[name].tobytes()
+        chunk["sessions"] += np.full(len(session["kinds"]), totals.sessions, dtype=np.int64).tobytes()
+        chunk["count"] += 1
+        if chunk["count"] >= CHUNK_SESSIONS:
+            flush(grid)
+
+    for grid in list(chunks):
+        flush(grid)
+    return totals
+
+
+def find_session_files(paths):
+    """Expand directories into the session files below them, sorted."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix in SESSION_SUFFIXES and p.is_file()))
+        else:
+            files.append(path)
+    return files
+
+
+def analyze(files, venue=None, workers=None, use_numpy=True):
+    """Aggregate the files, in parallel when there are several."""
+    totals = Totals()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) == 1:
+        for path in files:
+            totals.merge(analyze_file(path, venue, use_numpy))
+        return totals
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        for result in pool.map(analyze_file, files, [venue] * len(files), [use_numpy] * len(files)):
+            totals.merge(result)
+    return totals
+
+
+def ratio(part, whole):
+    return round(part / whole, 4) if whole else 0.0
+
+
+def summary_tables(totals):
+    """Return the report as {table name: (header, rows)}."""
+    difficulty_rows = []
+    rock_totals = {}  # rocks per pattern -> [patterns, presses, rock presses]
+    for difficulty in sorted(totals.difficulties):
+        patterns, presses, hits, rocks, empties = totals.difficulties[difficulty]
+        tiles, stumps = tile_split(max(difficulty, 1))
+        difficulty_rows.append([difficulty, patterns, presses, ratio(hits, presses), ratio(rocks, presses),
+                                ratio(empties, presses)])
+        row = rock_totals.setdefault(tiles - stumps, [0, 0, 0])
+        row[0] += patterns
+        row[1] += presses
+        row[2] += rocks
+
+    tile_rows = [
+        [f"{rows}x{cols}", tile // cols, tile % cols, hits, round(reaction_sum / hits, 1)]
+        for (rows, cols, tile), (hits, reaction_sum) in sorted(totals.tiles.items())
+    ]
+    venue_rows = [
+        [venue or "-", sessions, round(score_sum / sessions, 1), best, ratio(hits, hits + misses)]
+        for venue, (sessions, score_sum, best, hits, misses) in sorted(totals.venues.items())
+    ]
+    return {
+        "difficulty": (["difficulty", "patterns", "presses", "hit_rate", "rock_rate", "empty_rate"],
+                       difficulty_rows),
+        "rocks": (["rocks_per_pattern", "patterns", "presses", "rock_rate"],
+                  [[rocks, patterns, presses, ratio(rock_presses, presses)]
+                   for rocks, (patterns, presses, rock_presses) in sorted(rock_totals.items())]),
+        "tiles": (["grid", "row", "col", "hits", "mean_reaction_ms"], tile_rows),
+        "venues": (["venue", "sessions", "mean_score", "best_score", "hit_rate"], venue_rows),
+    }
+
+
+def write_tables(tables, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    for name, (header, rows) in tables.items():
+        with open(os.path.join(output_dir, f"{name}.csv"), "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+
+def print_tables(tables, out=sys.stdout):
+    for name, (header, rows) in tables.items():
+        widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+        print(f"\n{name}", file=out)
+        for row in [header] + rows:
+            print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)), file=out)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Summarize recorded game sessions")
+    parser.add_argument("paths", nargs="+", help="Session files, or directories to search for them")
+    parser.add_argument("--venue", help="Only sessions of this venue")
+    parser.add_argument("--output", help="Directory to write the tables to as CSV")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--no-numpy", action="store_true", help="Aggregate in pure Python")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = find_session_files(args.paths)
+    if not files:
+        raise SystemExit("No session files found")
+    totals = analyze(files, args.venue, args.workers, not args.no_numpy)
+    print(f"{totals.sessions} sessions, {totals.events} events in {len(files)} files")
+    tables = summary_tables(totals)
+    print_tables(tables)
+    if args.output:
+        write_tables(tables, args.output)
+
+
+if __name__ == "__main__":
+    main()
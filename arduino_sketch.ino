@@ -1,25 +1,45 @@
 #include <SPI.h>
 
-const int numRows = 3;
-const int numCols = 5;
+// Grid size: must match TILE_GRID on the host (grid_config.py), at most 256 tiles
+#define GRID_ROWS 3
+#define GRID_COLS 5
+const int numRows = GRID_ROWS;
+const int numCols = GRID_COLS;
 const int totalTiles = numRows * numCols;
 
-// LED pins for each tile (D14-D28)
-const int ledPins[15] = {14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28};
+// LED pins for each tile, row-major (D14-D28); one entry per tile
+const int ledPins[totalTiles] = {14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28};
 
-// SPI chip select pins for the two MCP3008 chips
-const int CS1 = 10; // MCP3008 #1
-const int CS2 = 9;  // MCP3008 #2
+// SPI chip select pins of the MCP3008 chips, 8 tiles per chip
+const int ADC_CHANNELS = 8;
+const int csPins[] = {10, 9}; // MCP3008 #1, #2; add one per 8 tiles
+const int numAdcChips = sizeof(csPins) / sizeof(csPins[0]);
 
 int brightnessValues[totalTiles]; // 0–255 for each tile
 unsigned long lastPressTime[totalTiles]; // for debounce
 const int debounceDelay = 300; // milliseconds
 const int pressThreshold = 15; // ADC value threshold
 
+// Serial link. The host negotiates the binary protocol with "proto bin";
+// until then (and for old hosts) plain text commands are used.
+const long baudRate = 115200;
+#define DEBUG_SERIAL 0 // 1 to print [DEBUG] / [PYTHON IN] lines (slows the link down)
+bool binaryMode = false;
+
+// Binary packets: sync, type, tile index, value, time in ms (uint32 LE), checksum
+// The checksum is the sum of the bytes between sync and checksum, modulo 256.
+const int PACKET_SIZE = 9;
+const byte PACKET_SYNC = 0xA5;
+const byte PACKET_LIGHT = 0x01;     // host -> Arduino: set tile <index> to PWM <value>
+const byte PACKET_LIGHT_ALL = 0x02; // host -> Arduino: set every tile to PWM <value>
+const byte PACKET_PRESS = 0x81;     // Arduino -> host: tile <index> pressed at <time>
+
 // Function to map brightness string to PWM value
 int mapBrightness(const String& brightness) {
   if (brightness == "bright" || brightness == "100") {
     return 255;
+  } else if (brightness == "medium") {
+    return 180;
   } else if (brightness == "dim" || brightness == "40") {
     return 100;
   } else if (brightness == "low" || brightness == "10") {
@@ -36,14 +56,31 @@ int mapBrightness(const String& brightness) {
   }
 }
 
+// Convert one hex digit to its value, -1 if it is not a hex digit
+int hexNibble(char c) {
+  if (c >= '0' && c <= '9') return c - '0';
+  if (c >= 'a' && c <= 'f') return c - 'a' + 10;
+  if (c >= 'A' && c <= 'F') return c - 'A' + 10;
+  return -1;
+}
+
+// Read the byte encoded by two hex digits at position pos, -1 if invalid
+int hexByte(const String& text, int pos) {
+  if (pos + 1 >= (int)text.length()) return -1;
+  int high = hexNibble(text.charAt(pos));
+  int low = hexNibble(text.charAt(pos + 1));
+  if (high < 0 || low < 0) return -1;
+  return (high << 4) | low;
+}
+
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(baudRate);
   SPI.begin();
 
-  pinMode(CS1, OUTPUT);
-  pinMode(CS2, OUTPUT);
-  digitalWrite(CS1, HIGH); // idle high
-  digitalWrite(CS2, HIGH);
+  for (int i = 0; i < numAdcChips; i++) {
+    pinMode(csPins[i], OUTPUT);
+    digitalWrite(csPins[i], HIGH); // idle high
+  }
 
   // Set LED pins as output
   for (int i = 0; i < totalTiles; i++) {
@@ -57,8 +94,14 @@ void setup() {
 }
 
 void loop() {
+#if DEBUG_SERIAL
   Serial.println("[DEBUG] Loop iteration start");
-  handleSerialCommands();
+#endif
+  if (binaryMode) {
+    handleBinaryPackets();
+  } else {
+    handleSerialCommands();
+  }
   readFSRsAndSendPressed();
   updateLEDs();
 }
@@ -66,21 +109,49 @@ void loop() {
 void handleSerialCommands() {
   if (Serial.available()) {
     String command = Serial.readStringUntil('\n');
+#if DEBUG_SERIAL
     Serial.print("[PYTHON IN] ");
     Serial.println(command);
     Serial.print("[DEBUG] Received command: ");
     Serial.println(command);
+#endif
 
     command.trim();
 
-    if (command.startsWith("light_all")) {
+    if (command == "proto bin") {
+      // Acknowledge in text, everything after this is binary packets
+      Serial.println("proto bin ok");
+      binaryMode = true;
+
+    } else if (command.startsWith("frame ")) {
+      // Full grid: "frame " followed by two hex digits of PWM per tile
+      for (int i = 0; i < totalTiles; i++) {
+        int pwmValue = hexByte(command, 6 + i * 2);
+        if (pwmValue < 0) break;
+        brightnessValues[i] = pwmValue;
+      }
+
+    } else if (command.startsWith("tiles ")) {
+      // Changed tiles only: "tiles " followed by <index><pwm> hex pairs
+      for (int pos = 6; pos + 3 < (int)command.length(); pos += 4) {
+        int index = hexByte(command, pos);
+        int pwmValue = hexByte(command, pos + 2);
+        if (index < 0 || pwmValue < 0) break;
+        if (index < totalTiles) {
+          brightnessValues[index] = pwmValue;
+        }
+      }
+
+    } else if (command.startsWith("light_all")) {
       String brightness = command.substring(10);
       int pwmValue = mapBrightness(brightness);
+#if DEBUG_SERIAL
       Serial.print("[DEBUG] Setting all tiles to brightness: ");
       Serial.print(brightness);
       Serial.print(" (PWM: ");
       Serial.print(pwmValue);
       Serial.println(")");
+#endif
       for (int i = 0; i < totalTiles; i++) {
         brightnessValues[i] = pwmValue;
       }
@@ -96,6 +167,7 @@ void handleSerialCommands() {
 
         if (index >= 0 && index < totalTiles) {
           int pwmValue = mapBrightness(brightness);
+#if DEBUG_SERIAL
           Serial.print("[DEBUG] Setting tile ");
           Serial.print(index);
           Serial.print(" to brightness: ");
@@ -103,6 +175,7 @@ void handleSerialCommands() {
           Serial.print(" (PWM: ");
           Serial.print(pwmValue);
           Serial.println(")");
+#endif
           brightnessValues[index] = pwmValue;
         }
       }
@@ -110,6 +183,58 @@ void handleSerialCommands() {
   }
 }
 
+void handleBinaryPackets() {
+  while (Serial.available() > 0) {
+    // Skip bytes until the start of a packet
+    if (Serial.peek() != PACKET_SYNC) {
+      Serial.read();
+      continue;
+    }
+    if (Serial.available() < PACKET_SIZE) {
+      return; // Wait for the rest of the packet
+    }
+
+    byte packet[PACKET_SIZE];
+    Serial.readBytes(packet, PACKET_SIZE);
+
+    byte checksum = 0;
+    for (int i = 1; i < PACKET_SIZE - 1; i++) {
+      checksum += packet[i];
+    }
+    if (checksum != packet[PACKET_SIZE - 1]) {
+      continue; // Corrupted, resync on the next sync byte
+    }
+
+    byte type = packet[1];
+    byte index = packet[2];
+    byte value = packet[3];
+    if (type == PACKET_LIGHT && index < totalTiles) {
+      brightnessValues[index] = value;
+    } else if (type == PACKET_LIGHT_ALL) {
+      for (int i = 0; i < totalTiles; i++) {
+        brightnessValues[i] = value;
+      }
+    }
+  }
+}
+
+void sendPressPacket(int index, unsigned long now) {
+  byte packet[PACKET_SIZE];
+  packet[0] = PACKET_SYNC;
+  packet[1] = PACKET_PRESS;
+  packet[2] = index;
+  packet[3] = 0;
+  for (int i = 0; i < 4; i++) {
+    packet[4 + i] = (now >> (8 * i)) & 0xFF;
+  }
+  byte checksum = 0;
+  for (int i = 1; i < PACKET_SIZE - 1; i++) {
+    checksum += packet[i];
+  }
+  packet[PACKET_SIZE - 1] = checksum;
+  Serial.write(packet, PACKET_SIZE);
+}
+
 void updateLEDs() {
   for (int i = 0; i < totalTiles; i++) {
     analogWrite(ledPins[i], brightnessValues[i]);
@@ -124,10 +249,17 @@ void readFSRsAndSendPressed() {
       if (now - lastPressTime[i] > debounceDelay) {
         int row = i / numCols;
         int col = i % numCols;
-        Serial.print("pressed ");
-        Serial.print(row);
-        Serial.print(" ");
-        Serial.println(col);
+        if (binaryMode) {
+          sendPressPacket(i, now);
+        } else {
+          Serial.print("pressed ");
+          Serial.print(row);
+          Serial.print(" ");
+          Serial.print(col);
+          Serial.print(" ");
+          Serial.println(now); // press time in ms, lets the host score the exact moment
+        }
+#if DEBUG_SERIAL
         Serial.print("[DEBUG] Tile press detected - Index: ");
         Serial.print(i);
         Serial.print(", Row: ");
@@ -136,6 +268,7 @@ void readFSRsAndSendPressed() {
         Serial.print(col);
         Serial.print(", ADC Value: ");
         Serial.println(adcVal);
+#endif
         lastPressTime[i] = now;
       }
     }
@@ -143,10 +276,11 @@ void readFSRsAndSendPressed() {
 }
 
 int readADC(int index) {
-  int chip = (index < 8) ? 1 : 2;
-  int channel = (index < 8) ? index : (index - 8);
+  int chip = index / ADC_CHANNELS + 1;
+  int channel = index % ADC_CHANNELS;
+  if (chip > numAdcChips) return 0; // No sensor wired for this tile
 
-  int csPin = (chip == 1) ? CS1 : CS2;
+  int csPin = csPins[chip - 1];
 
   digitalWrite(csPin, LOW);
   SPI.transfer(0x01); // Start bit
@@ -157,6 +291,7 @@ int readADC(int index) {
 
   int result = ((highBits & 0x03) << 8) | lowBits;
   
+#if DEBUG_SERIAL
   Serial.print("[DEBUG] readADC - Index: ");
   Serial.print(index);
   Serial.print(", Chip: ");
@@ -165,6 +300,7 @@ int readADC(int index) {
   Serial.print(channel);
   Serial.print(", ADC Value: ");
   Serial.println(result);
+#endif
   
   return result;
 }
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class AssetCache:
+    """
+    Loads images, fonts and rendered text once and reuses them across frames.
+
+    Scaled images and rendered text depend on the display resolution, so they
+    are dropped whenever the resolution changes (see set_resolution).
+    """
+
+    def __init__(self, max_text_surfaces=256):
+        """
+        Args:
+            max_text_surfaces: Number of rendered text surfaces kept before the
+                               least recently used ones are dropped
+        """
+        self.resolution = None
+        self.max_text_surfaces = max_text_surfaces
+        self.fonts = {}
+        self.images = {}
+        self.texts = OrderedDict()
+
+    def set_resolution(self, resolution):
+        """Invalidate resolution-dependent assets if the display size changed."""
+        resolution = tuple(resolution)
+        if resolution != self.resolution:
+            self.resolution = resolution
+            self.invalidate()
+
+    def invalidate(self):
+        """Drop scaled images and rendered text; they are rebuilt on next use."""
+        self.images.clear()
+        self.texts.clear()
+
+    def get_font(self, size, name=None):
+        """Return a pygame Font, creating it on first use."""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def get_image(self, path, size=None):
+        """
+        Return the image at path scaled to size, loading it on first use.
+
+        Returns:
+            Surface, or None if the image could not be loaded (the failure is
+            cached too, so a missing file is not looked up every frame)
+        """
+        key = (str(path), tuple(size) if size else None)
+        if key in self.images:
+            return self.images[key]
+
+        try:
+            image = pygame.image.load(str(path))
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha()
+            if size:
+                image = pygame.transform.scale(image, size)
+        except (pygame.error, FileNotFoundError):
+            image = None
+
+        self.images[key] = image
+        return image
+
+    def render_text(self, text, size, color):
+        """Return text rendered with the default font, rendering it on first use."""
+        key = (text, size, color)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.texts.move_to_end(key)
+            return surface
+
+        surface = self.get_font(size).render(text, True, color)
+        self.texts[key] = surface
+        if len(self.texts) > self.max_text_surfaces:
+            self.texts.popitem(last=False)
+        return surface
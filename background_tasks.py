@@ -0,0 +1,78 @@
+import itertools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+# Posted when a task submitted with on_done finishes (game_engine uses USEREVENT + 1)
+TASK_DONE = pygame.USEREVENT + 2
+
+
+class BackgroundTasks:
+    """
+    Runs slow side effects (video commands, file, process and serial I/O) on
+    worker threads so the main loop never waits on them.
+
+    When a task submitted with on_done finishes, a TASK_DONE event is posted;
+    handle_event() then runs on_done(result, error) on the main thread, where
+    it can safely touch the engine. With the default single worker, tasks run
+    in the order they were submitted (e.g. the intro's loadfile before the
+    outro's).
+    """
+
+    def __init__(self, max_workers=1):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        self.callbacks = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count()
+
+    def submit(self, fn, *args, on_done=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a worker thread.
+
+        Args:
+            on_done: Callback(result, error) run on the main thread afterwards;
+                     error is the exception raised by fn, or None
+
+        Returns:
+            The Future of the task
+        """
+        future = self.executor.submit(fn, *args, **kwargs)
+        if on_done is None:
+            future.add_done_callback(self._log_error)
+        else:
+            with self.lock:
+                task_id = next(self.ids)
+                self.callbacks[task_id] = on_done
+            future.add_done_callback(
+                lambda done: pygame.event.post(pygame.event.Event(TASK_DONE, task_id=task_id, future=done))
+            )
+        return future
+
+    @staticmethod
+    def _log_error(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Background task failed: {future.exception()!r}")
+
+    def handle_event(self, event):
+        """
+        Run the callback of a finished task.
+
+        Returns:
+            True if the event was a TASK_DONE event
+        """
+        if event.type != TASK_DONE:
+            return False
+        with self.lock:
+            on_done = self.callbacks.pop(event.task_id, None)
+        if on_done is not None and not event.future.cancelled():
+            error = event.future.exception()
+            on_done(None if error else event.future.result(), error)
+        return True
+
+    def shutdown(self, wait=True):
+        """Finish (or with wait=False, drop) the queued tasks and stop the workers."""
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,300 @@
+"""
+Micro-benchmarks for the hot paths of the game.
+
+    python benchmarks/run_benchmarks.py                     # run, print, write results JSON
+    python benchmarks/run_benchmarks.py --save-baseline     # also store them as the baseline
+    python benchmarks/run_benchmarks.py --filter serial     # only benchmarks whose name matches
+
+Results are compared against benchmarks/baseline.json when it exists; any
+benchmark slower than the baseline by more than --threshold is reported as a
+regression and the exit status is 1. Baselines are machine specific: save one
+on the hardware you deploy to.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pygame  # noqa: E402
+
+import tile_comm  # noqa: E402
+from pattern_logic import generate_pattern, generate_patterns  # noqa: E402
+from score_tracker import ScoreTracker  # noqa: E402
+from scoring import make_scoring  # noqa: E402
+from tile_logic import draw_tile_grid  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results.json"
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark: a function returning (callable, operations per call)."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+class FakeSerial:
+    """Stands in for serial.Serial: swallows writes, serves canned input."""
+
+    def __init__(self, incoming=b""):
+        self.is_open = True
+        self.incoming = incoming
+        self.bytes_written = 0
+
+    @property
+    def in_waiting(self):
+        return len(self.incoming)
+
+    def write(self, data):
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def read(self, size=1):
+        data, self.incoming = self.incoming[:size], self.incoming[size:]
+        return data
+
+    def close(self):
+        self.is_open = False
+
+
+def make_controller(protocol, incoming=b""):
+    controller = tile_comm.ArduinoTileController(auto_reconnect=False)
+    controller.serial_connection = FakeSerial(incoming)
+    controller.is_connected = True
+    controller.protocol = protocol
+    return controller
+
+
+# Pattern generation
+
+for difficulty in range(1, 6):
+    @benchmark(f"generate_pattern/difficulty_{difficulty}")
+    def _pattern(difficulty=difficulty):
+        def run():
+            last = (1, 2)
+            for played in range(100):
+                pattern = generate_pattern(difficulty, last, played % 30)
+                last = next(pos for pos, kind in pattern.items() if kind == "stump")
+        return run, 100
+
+
+@benchmark("generate_patterns/session_of_60")
+def _session():
+    difficulties = [min(5, 1 + i // 8) for i in range(60)]
+    def run():
+        generate_patterns(difficulties)
+    return run, 60
+
+
+# Rendering
+
+# Grid areas of the game window at common display sizes
+for size in [(360, 240), (458, 448), (930, 420), (1920, 900)]:
+    @benchmark(f"draw_tile_grid/{size[0]}x{size[1]}")
+    def _draw(size=size):
+        surface = pygame.Surface(size).convert()  # Display format, like the game's surfaces
+        patterns = [{(0, 1): "stump", (2, 3): "rock"}, {(1, 1): "stump", (0, 4): "rock", (2, 0): "rock"}]
+        def run():
+            for i in range(50):
+                surface.fill((0, 0, 0))
+                draw_tile_grid(surface, patterns[i % 2])
+        return run, 50
+
+
+# Serial encoding and parsing
+
+def _frames():
+    frames = []
+    for i in range(20):
+        frame = [["dim"] * tile_comm.GRID_COLS for _ in range(tile_comm.GRID_ROWS)]
+        frame[i % tile_comm.GRID_ROWS][i % tile_comm.GRID_COLS] = "bright"
+        frame[(i + 1) % tile_comm.GRID_ROWS][(i + 2) % tile_comm.GRID_COLS] = "medium"
+        frames.append(frame)
+    return frames
+
+
+for protocol in ("text", "binary"):
+    @benchmark(f"serial/encode_frame_{protocol}")
+    def _encode(protocol=protocol):
+        controller = make_controller(protocol)
+        frames = _frames()
+        def run():
+            for frame in frames:
+                controller.light_frame(frame)
+                levels = list(controller.target_frame)
+                controller.pending_tiles.clear()
+                controller._encode_update(levels, controller.last_frame, controller.protocol)
+                controller.last_frame = levels
+        return run, len(frames)
+
+
+@benchmark("serial/parse_text_presses")
+def _parse_text():
+    lines = []
+    for i in range(100):
+        lines.append(f"pressed {i % 3} {i % 5} {1000 + i}\n".encode())
+        lines.append(b"[DEBUG] Loop iteration start\n")
+    data = b"".join(lines)
+    controller = make_controller("text")
+    def run():
+        controller._handle_chunk(data, time.perf_counter())
+        controller.press_events.clear()
+    return run, 100
+
+
+@benchmark("serial/parse_binary_presses")
+def _parse_binary():
+    data = b"".join(
+        tile_comm.encode_packet(tile_comm.PACKET_PRESS, i % tile_comm.TOTAL_TILES, 0, 1000 + i)
+        for i in range(100)
+    )
+    controller = make_controller("binary")
+    def run():
+        controller._handle_chunk(data, time.perf_counter())
+        controller.press_events.clear()
+    return run, 100
+
+
+# Scoring
+
+@benchmark("score_tracker/check_tile_press")
+def _score():
+    tracker = ScoreTracker()
+    pattern = {(0, 1): "stump", (2, 3): "rock", (1, 4): "rock"}
+    presses = [(0, 1), (2, 3), (1, 1), (1, 4)]
+    def run():
+        now = time.perf_counter()
+        for i in range(100):
+            tracker.start_pattern(pattern, now)
+            tracker.check_tile_press(presses[i % 4], pattern, now + 0.2)
+    return run, 100
+
+
+@benchmark("score_tracker/check_tile_press_speed_streak")
+def _score_curves():
+    tracker = ScoreTracker(scoring=make_scoring("speed,streak"))
+    pattern = {(0, 1): "stump", (2, 3): "rock", (1, 4): "rock"}
+    presses = [(0, 1), (0, 1), (0, 1), (2, 3)]
+    def run():
+        now = time.perf_counter()
+        for i in range(100):
+            tracker.start_pattern(pattern, now)
+            tracker.check_tile_press(presses[i % 4], pattern, now + 0.2 + i * 0.01)
+    return run, 100
+
+
+def measure(run, ops, repeats, min_time):
+    """Time run() repeatedly; return nanoseconds per operation for each repeat."""
+    # Calibrate the number of calls so one repeat lasts about min_time
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or calls >= 1 << 20:
+            break
+        calls *= 2
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            run()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed / (calls * ops) * 1e9)
+    return samples
+
+
+def run_benchmarks(name_filter=None, repeats=5, min_time=0.05):
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        run, ops = setup()
+        samples = measure(run, ops, repeats, min_time)
+        results[name] = {
+            "ns_per_op": min(samples),
+            "median_ns_per_op": statistics.median(samples),
+            "repeats": repeats,
+        }
+        print(f"{name:45s} {min(samples):12.1f} ns/op")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against the baseline; return the names that regressed."""
+    regressions = []
+    print()
+    print(f"{'benchmark':45s} {'baseline':>12s} {'now':>12s} {'change':>8s}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:45s} {'-':>12s} {result['ns_per_op']:12.1f}      new")
+            continue
+        change = result["ns_per_op"] / base["ns_per_op"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:45s} {base['ns_per_op']:12.1f} {result['ns_per_op']:12.1f} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per repeat")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Results JSON file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Slowdown against the baseline reported as a regression (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))  # Surfaces and sprites convert to the display format as in game
+    results = run_benchmarks(args.filter, args.repeats, args.min_time)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "pygame": pygame.version.ver,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+
+    regressions = []
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline saved to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+
+    pygame.quit()
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import random
+import time
+
+import pygame
+
+from grid_config import GRID_ROWS, GRID_COLS
+from pattern_schedule import PatternSchedule
+from score_tracker import ScoreTracker
+from game_states import (
+    WAITING_FOR_START, PLAYING_INTRO, PLAYING_GAME, GAME_OVER,
+    SHOWING_FINAL_SCORE, SHOWING_WIN_LOSE_TEXT,
+)
+
+# Game logic advances in fixed steps, independent of the frame rate
+UPDATE_STEP_MS = 10
+MAX_STEPS_PER_FRAME = 10  # Don't spiral after a long stall, drop the time instead
+
+START_TILE = (GRID_ROWS - 1, GRID_COLS // 2)  # Middle of the bottom row starts the game
+
+# Posted by video outputs when a clip they registered with expect_video() ends
+VIDEO_FINISHED = pygame.USEREVENT + 1
+
+
+class GameEngine:
+    """
+    The game state machine, shared by every way of playing.
+
+    Inputs and outputs are pluggable backends:
+    - inputs provide handle_event(event) for pygame events and poll(), which
+      returns the presses (objects with row, col and t_press) since the last call
+    - outputs provide on_state_change(engine, old_state, new_state) and
+      render(engine)
+
+    update() advances game time by a fixed step; every transition is driven
+    by timers on that game time, or by the end of a video, nothing blocks.
+    The patterns of a game come from a PatternSchedule generated when it
+    starts.
+    """
+
+    def __init__(self, inputs, outputs, tracker=None, instruments=None, seed=None):
+        """
+        Args:
+            inputs: List of input backends
+            outputs: List of output backends
+            tracker: ScoreTracker to use (a new one by default)
+            instruments: Instrumentation recording press-to-score latency
+            seed: Seed for the per-game pattern seeds, to make a run of games
+                  reproducible (random by default)
+        """
+        self.inputs = inputs
+        self.outputs = outputs
+        self.tracker = tracker or ScoreTracker()
+        self.instruments = instruments
+
+        # Timing, all in milliseconds of game time
+        self.pattern_interval = 3000  # 3 seconds, goes down to 1.5 s
+        self.min_pattern_interval = 1500
+        self.difficulty_interval = 12000  # 12 seconds per difficulty level
+        self.max_difficulty = 5
+        self.intro_duration = 3000  # Intro before the first pattern, when no video reports its end
+        self.game_duration = 120000  # 2 minutes
+        self.win_lose_duration = 5000  # 5 seconds for win/lose, when no video reports its end
+        self.video_timeout = 60000  # Longest wait for a video to report its end
+        self.win_lose_text_duration = 3000  # 3 seconds for win/lose text display
+
+        self.now = 0
+        self.state = WAITING_FOR_START
+        self.state_started = 0
+        self.active_tiles = {START_TILE: "cue"}  # Initialize with the start tile as cue
+        self.current_difficulty = 1
+        self.total_patterns_played = 0
+        self.game_start_time = 0
+        self.won = False
+
+        # Patterns of the current game, generated when it starts
+        self.seeds = random.Random(seed)
+        self.schedule = None
+        self.replay_schedule = None  # Set to a PatternSchedule to replay it in the next game
+        self.pattern_index = -1
+
+        self.clear_video()
+
+    def clear_video(self):
+        # Video shown in the current state: None (timers apply), "playing" or "ended"
+        self.video_state = None
+        self.expected_video = None
+
+    def set_state(self, new_state):
+        """Switch state and let the outputs react to it."""
+        old_state = self.state
+        self.state = new_state
+        self.state_started = self.now
+        self.clear_video()
+        for output in self.outputs:
+            output.on_state_change(self, old_state, new_state)
+
+    def time_in_state(self):
+        return self.now - self.state_started
+
+    def expect_video(self, clip):
+        """
+        Called by an output starting a video for the new state: the state
+        then lasts until video_finished(clip) instead of its timer.
+        """
+        self.video_state = "playing"
+        self.expected_video = clip
+
+    def video_finished(self, clip):
+        if self.video_state == "playing" and clip == self.expected_video:
+            self.video_state = "ended"
+
+    def video_failed(self, clip):
+        """The expected video could not be played: the state falls back to its timer."""
+        if self.video_state == "playing" and clip == self.expected_video:
+            self.clear_video()
+
+    def state_finished(self, duration):
+        """
+        Whether a state with a video is over: the video ended, or duration
+        passed if none plays.
+        """
+        if self.video_state == "ended":
+            return True
+        if self.video_state == "playing":
+            return self.time_in_state() >= self.video_timeout
+        return self.time_in_state() >= duration
+
+    def handle_event(self, event):
+        """Pass a pygame event to the input backends."""
+        if event.type == VIDEO_FINISHED:
+            self.video_finished(event.clip)
+            return
+        for backend in self.inputs:
+            backend.handle_event(event)
+        # Leftover from the final score screen: any key returns to the start
+        if self.state == SHOWING_FINAL_SCORE and event.type == pygame.KEYDOWN:
+            self.reset_to_start()
+
+    def poll_presses(self):
+        """Collect the presses of every input backend, oldest first."""
+        presses = []
+        for backend in self.inputs:
+            presses.extend(backend.poll())
+        if len(presses) > 1:
+            presses.sort(key=lambda press: press.t_press)
+        return presses
+
+    def update(self, step_ms):
+        """Advance the game by step_ms milliseconds."""
+        self.now += step_ms
+        presses = self.poll_presses()
+
+        if self.state == WAITING_FOR_START:
+            if any((press.row, press.col) == START_TILE for press in presses):
+                self.start_intro()
+
+        elif self.state == PLAYING_INTRO:
+            if self.state_finished(self.intro_duration):
+                self.start_game()
+
+        elif self.state == PLAYING_GAME:
+            self.update_game(presses)
+
+        elif self.state == GAME_OVER:
+            # Outro video, then the win/lose text
+            if self.state_finished(self.win_lose_duration):
+                self.set_state(SHOWING_WIN_LOSE_TEXT)
+
+        elif self.state == SHOWING_WIN_LOSE_TEXT:
+            if self.time_in_state() > self.win_lose_text_duration:
+                self.reset_to_start()
+
+        # Presses in any other state (videos, end screens) are dropped
+
+    def start_intro(self):
+        self.set_state(PLAYING_INTRO)
+
+    def start_game(self):
+        self.tracker.reset()
+        self.schedule = self.replay_schedule or self.new_schedule()
+        self.replay_schedule = None
+        self.pattern_index = -1
+        self.current_difficulty = 1
+        self.active_tiles = {}  # Clear the start tile cue
+        self.total_patterns_played = 0
+        self.game_start_time = self.now
+        self.set_state(PLAYING_GAME)
+
+    def new_schedule(self, seed=None):
+        """Generate the patterns of a game, with a fresh seed unless one is given."""
+        return PatternSchedule.generate(
+            seed=self.seeds.getrandbits(32) if seed is None else seed,
+            game_duration=self.game_duration,
+            pattern_interval=self.pattern_interval,
+            min_pattern_interval=self.min_pattern_interval,
+            difficulty_interval=self.difficulty_interval,
+            max_difficulty=self.max_difficulty,
+        )
+
+    def update_game(self, presses):
+        # Score every press at the time it happened
+        for press in presses:
+            self.tracker.check_tile_press((press.row, press.col), self.active_tiles, press.t_press)
+        if presses and self.instruments is not None:
+            scored = time.perf_counter()
+            for press in presses:
+                self.instruments.record_press(scored - press.t_arrival)
+
+        # Check if game time is up
+        elapsed = self.now - self.game_start_time
+        if elapsed >= self.schedule.game_duration:
+            self.end_game(self.tracker.score > 0)
+            return
+
+        # Show the next pattern once its time in the schedule has come
+        index = self.schedule.next_index(elapsed, self.pattern_index)
+        if index != self.pattern_index:
+            self.show_pattern(index)
+
+    def show_pattern(self, index):
+        schedule = self.schedule
+        old_tiles = self.active_tiles
+        self.pattern_index = index
+        self.active_tiles = schedule.patterns[index]
+        self.current_difficulty = schedule.difficulties[index]
+        self.total_patterns_played = index + 1
+        # Reset the scoring flag for the new pattern
+        self.tracker.start_pattern(old_tiles, time.perf_counter(), self.active_tiles,
+                                   self.current_difficulty)
+
+    def end_game(self, won):
+        """End the game; the outputs play the win/lose video."""
+        self.won = won
+        self.set_state(GAME_OVER)
+
+    def reset_to_start(self):
+        self.active_tiles = {START_TILE: "cue"}  # Highlight the start tile
+        self.set_state(WAITING_FOR_START)
+
+    def render(self):
+        for output in self.outputs:
+            output.render(self)
@@ -0,0 +1,440 @@
+import time
+from pathlib import Path
+
+import pygame
+
+from game_states import (
+    WAITING_FOR_START, PLAYING_INTRO, PLAYING_GAME, GAME_OVER,
+    SHOWING_FINAL_SCORE, SHOWING_WIN_LOSE_TEXT,
+)
+from game_engine import VIDEO_FINISHED, START_TILE
+from grid_config import GRID_ROWS, GRID_COLS
+from mpv_player import MpvPlayer
+from session_log import append_session
+from tile_comm import PressEvent, get_press_events, light_frame
+from tile_logic import get_grid_layout
+
+
+def make_press(row, col):
+    """A press from a local input device, timestamped now."""
+    now = time.perf_counter()
+    return PressEvent(row, col, now, now)
+
+
+# Input backends: handle_event(event) sees every pygame event, poll() returns
+# the presses since the last call
+
+# Keyboard rows Q-T, A-G and Z-B → tiles (0,0)-(0,4), (1,0)-(1,4), (2,0)-(2,4)
+KEY_TILES = {
+    key: (row, col)
+    for row, keys in enumerate((
+        (pygame.K_q, pygame.K_w, pygame.K_e, pygame.K_r, pygame.K_t),
+        (pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_f, pygame.K_g),
+        (pygame.K_z, pygame.K_x, pygame.K_c, pygame.K_v, pygame.K_b),
+    ))
+    for col, key in enumerate(keys)
+}
+# Space and Enter press the start tile, wherever it is on larger grids
+START_KEYS = (pygame.K_SPACE, pygame.K_RETURN)
+
+
+class KeyboardInput:
+    """
+    Keyboard rows Q-T, A-G and Z-B mapped onto the top-left 3x5 tiles, and
+    Space or Enter onto the start tile.
+
+    Every KEYDOWN is one press, timestamped when the event is handled, so
+    several keys going down together are all counted and a tap shorter than
+    a frame is not missed. Holding a key does not press again (key repeats
+    are ignored until its KEYUP).
+    """
+
+    def __init__(self, key_tiles=None):
+        """
+        Args:
+            key_tiles: Dictionary of pygame key -> (row, col), KEY_TILES by default
+        """
+        key_tiles = KEY_TILES if key_tiles is None else key_tiles
+        self.key_tiles = {
+            key: tile for key, tile in key_tiles.items()
+            if tile[0] < GRID_ROWS and tile[1] < GRID_COLS
+        }
+        for key in START_KEYS:
+            self.key_tiles.setdefault(key, START_TILE)
+        self.held = set()
+        self.presses = []
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            tile = self.key_tiles.get(event.key)
+            if tile is not None and event.key not in self.held:
+                self.held.add(event.key)
+                self.presses.append(make_press(*tile))
+        elif event.type == pygame.KEYUP:
+            self.held.discard(event.key)
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.held.clear()  # The KEYUPs go to another window
+
+    def poll(self):
+        presses, self.presses = self.presses, []
+        return presses
+
+
+class MouseInput:
+    """Mouse clicks and touches on the on-screen grid."""
+
+    def __init__(self, grid_rect):
+        """
+        Args:
+            grid_rect: Screen rect the tile grid is drawn in
+        """
+        self.grid_rect = pygame.Rect(grid_rect)
+        self.presses = []
+
+    def handle_event(self, event):
+        pos = self.get_pointer_pos(event)
+        if pos is None:
+            return
+        tile = self.tile_at(pos)
+        if tile is not None:
+            self.presses.append(make_press(*tile))
+
+    def poll(self):
+        presses, self.presses = self.presses, []
+        return presses
+
+    def tile_at(self, pos):
+        """Return the (row, col) of the tile at screen position pos, or None"""
+        layout = get_grid_layout(self.grid_rect.size)
+        return layout.tile_at(pos[0] - self.grid_rect.x, pos[1] - self.grid_rect.y)
+
+    @staticmethod
+    def get_pointer_pos(event):
+        """Return the screen position of a mouse click or touch event, or None for other events"""
+        if event.type == pygame.MOUSEBUTTONDOWN and not getattr(event, "touch", False):
+            return event.pos
+        if event.type == pygame.FINGERDOWN:
+            # Touch coordinates are normalized to 0-1
+            width, height = pygame.display.get_surface().get_size()
+            return (event.x * width, event.y * height)
+        return None
+
+
+class ArduinoInput:
+    """Presses from the tile floor (tile_comm must be initialized)."""
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self):
+        return get_press_events()
+
+
+# Output backends: on_state_change(engine, old_state, new_state) on every
+# transition, render(engine) once per frame
+
+class ScreenOutput:
+    """Draws the game on the pygame window."""
+
+    background = (20, 20, 20)
+
+    def __init__(self, screen, assets, renderer, show_splash=False, instruments=None, overlay=None,
+                 leaderboard=None):
+        """
+        Args:
+            screen: Pygame display surface
+            assets: AssetCache for text
+            renderer: GameplayRenderer for the gameplay screen
+            show_splash: Show the fullscreen splash while waiting for a player
+                         instead of the grid with the start cue
+            instruments: Instrumentation to report display update times to
+            overlay: DebugOverlay drawn on top while it is visible
+            leaderboard: Leaderboard whose top scores of the day the splash shows
+        """
+        self.screen = screen
+        self.assets = assets
+        self.renderer = renderer
+        self.show_splash = show_splash
+        self.instruments = instruments
+        self.overlay = overlay
+        self.overlay_shown = False
+        self.leaderboard = leaderboard
+        self.drawn_screen = None  # Fullscreen screen currently shown
+
+    def on_state_change(self, engine, old_state, new_state):
+        pass
+
+    def render(self, engine):
+        overlay_visible = self.overlay is not None and self.overlay.visible
+        if self.overlay_shown and not overlay_visible:
+            self.invalidate()  # Draw over the panel
+        self.overlay_shown = overlay_visible
+
+        state = engine.state
+        if state == WAITING_FOR_START and self.show_splash:
+            # Redrawn only when the cached top scores change
+            version = self.leaderboard.version if self.leaderboard is not None else None
+            self.show_fullscreen(("splash", version), self.draw_splash_screen)
+        elif state in (WAITING_FOR_START, PLAYING_GAME):
+            self.drawn_screen = None
+            dirty_rects = self.renderer.render(state, engine.active_tiles, engine.tracker)
+            if dirty_rects:
+                self.update_display(dirty_rects)
+        elif state == SHOWING_WIN_LOSE_TEXT:
+            self.show_fullscreen(("win_lose", engine.won, engine.tracker.score),
+                                 lambda: self.draw_win_lose_text(engine.won, engine.tracker))
+        elif state == SHOWING_FINAL_SCORE:
+            self.show_fullscreen(("final_score", engine.tracker.score),
+                                 lambda: self.draw_final_score(engine.tracker))
+        # The intro and outro videos play in their own window
+
+        if overlay_visible:
+            self.update_display([self.overlay.draw(self.screen)])
+
+    def invalidate(self):
+        """Redraw the whole screen on the next render."""
+        self.renderer.invalidate()
+        self.drawn_screen = None
+
+    def update_display(self, rects=None):
+        """Push rects (everything if None) to the display, timing it."""
+        start = time.perf_counter()
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        if self.instruments is not None:
+            self.instruments.add_flip(time.perf_counter() - start)
+
+    def show_fullscreen(self, key, draw):
+        """Draw a fullscreen screen, only when it differs from the one shown."""
+        if key == self.drawn_screen:
+            return
+        self.renderer.invalidate()  # The gameplay screen is drawn over
+        self.screen.fill(self.background)
+        draw()
+        self.update_display()
+        self.drawn_screen = key
+
+    def blit_centered(self, surface, dy):
+        width, height = self.screen.get_size()
+        self.screen.blit(surface, surface.get_rect(center=(width // 2, height // 2 + dy)))
+
+    def draw_splash_screen(self):
+        """Show splash screen in fullscreen"""
+        self.blit_centered(self.assets.render_text("TILE GAME", 72, (255, 255, 255)), -50)
+        self.blit_centered(self.assets.render_text("Step on the lit bottom tile to begin", 36, (200, 200, 200)), 50)
+        if self.leaderboard is not None:
+            self.draw_top_scores(self.leaderboard.top("today"), 130)
+
+    def draw_top_scores(self, top, dy):
+        """Show a leaderboard top list starting dy below the center"""
+        if not top:
+            return
+        self.blit_centered(self.assets.render_text("Today's best", 36, (255, 215, 0)), dy)
+        for place, (score, _) in enumerate(top, 1):
+            self.blit_centered(self.assets.render_text(f"{place}.  {score}", 32, (220, 220, 220)), dy + 40 * place)
+
+    def draw_final_score(self, tracker):
+        """Show final score in fullscreen"""
+        assets = self.assets
+        self.blit_centered(assets.render_text(f"Final Score: {tracker.score}", 72, (255, 255, 255)), -100)
+        self.blit_centered(assets.render_text(f"Hits: {tracker.hits}", 48, (0, 255, 0)), -20)
+        self.blit_centered(assets.render_text(f"Misses: {tracker.misses}", 48, (255, 0, 0)), 20)
+        self.draw_game_stats(tracker, 60)
+        self.blit_centered(assets.render_text("Press any key to play again", 36, (200, 200, 200)), 100)
+
+    def draw_win_lose_text(self, won, tracker):
+        """Show win/lose text in fullscreen after the outro video"""
+        assets = self.assets
+        if won:
+            message_text = assets.render_text("YOU WIN!", 72, (0, 255, 0))
+        else:
+            message_text = assets.render_text("GAME OVER", 72, (255, 0, 0))
+        self.blit_centered(message_text, -50)
+        self.blit_centered(assets.render_text(f"Final Score: {tracker.score}", 48, (255, 255, 255)), 50)
+        self.draw_game_stats(tracker, 110)
+
+    def draw_game_stats(self, tracker, dy):
+        """Show the best streak and median reaction time of the game dy below the center"""
+        if tracker.reactions.count:
+            stats = f"Best streak: {tracker.best_streak}   Reaction: {tracker.reactions.percentile(50)} ms"
+            self.blit_centered(self.assets.render_text(stats, 32, (200, 200, 200)), dy)
+
+
+def build_tile_frame(tiles, background="dim"):
+    """
+    Build the brightness frame for the floor from a tile pattern:
+    stumps bright, rocks medium, the start cue bright and every other tile
+    at the background level.
+    """
+    levels = {"stump": "bright", "rock": "medium", "cue": "bright"}
+    return [
+        [levels.get(tiles.get((row, col)), background) for col in range(GRID_COLS)]
+        for row in range(GRID_ROWS)
+    ]
+
+
+class TileLedOutput:
+    """
+    Mirrors the active tiles on the floor LEDs (tile_comm must be initialized).
+    The other tiles glow dim during play and are off otherwise, so only the
+    start tile is lit while waiting.
+    """
+
+    def __init__(self):
+        self.lit_tiles = None
+        self.lit_background = None
+
+    def on_state_change(self, engine, old_state, new_state):
+        pass
+
+    def render(self, engine):
+        # Only queue a frame when the floor changed; tile_comm sends the diff
+        background = "dim" if engine.state == PLAYING_GAME else "off"
+        if engine.active_tiles != self.lit_tiles or background != self.lit_background:
+            light_frame(build_tile_frame(engine.active_tiles, background))
+            self.lit_tiles = dict(engine.active_tiles)
+            self.lit_background = background
+
+
+class ScheduleArchiveOutput:
+    """
+    Saves the pattern schedule of every game as it starts, to
+    <directory>/<date>-<time>-<seed>.json, so a disputed game can be
+    replayed with --replay. Written on tasks (BackgroundTasks) if set.
+    """
+
+    def __init__(self, directory, tasks=None):
+        self.directory = Path(directory)
+        self.tasks = tasks
+
+    def on_state_change(self, engine, old_state, new_state):
+        if new_state != PLAYING_GAME:
+            return
+        schedule = engine.schedule
+        path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{schedule.seed}.json"
+        if self.tasks is None:
+            self.save(schedule, path)
+        else:
+            self.tasks.submit(self.save, schedule, path)
+
+    def render(self, engine):
+        pass
+
+    def save(self, schedule, path):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            schedule.save(path)
+        except OSError as e:
+            print(f"Could not save the schedule to {path}: {e}")
+
+
+class LeaderboardOutput:
+    """Records each finished game's score on a Leaderboard (written in the background)."""
+
+    def __init__(self, leaderboard):
+        self.leaderboard = leaderboard
+
+    def on_state_change(self, engine, old_state, new_state):
+        if new_state == GAME_OVER:
+            tracker = engine.tracker
+            self.leaderboard.add(tracker.score, tracker.hits, tracker.misses, seed=engine.schedule.seed)
+
+    def render(self, engine):
+        pass
+
+
+class SessionLogOutput:
+    """
+    Appends each finished game's session log (see session_log) to a file:
+    binary if the name ends in .bin, JSON lines otherwise. With tasks
+    (BackgroundTasks) set, the file is written off the main loop.
+    """
+
+    def __init__(self, path, venue="", tasks=None):
+        self.path = path
+        self.venue = venue
+        self.tasks = tasks
+
+    def on_state_change(self, engine, old_state, new_state):
+        if new_state != GAME_OVER:
+            return
+        session = engine.tracker.finish_session(seed=engine.schedule.seed, venue=self.venue)
+        if self.tasks is None:
+            self.write(session)
+        else:
+            self.tasks.submit(self.write, session)
+
+    def render(self, engine):
+        pass
+
+    def write(self, session):
+        try:
+            append_session(self.path, session)
+        except OSError as e:
+            print(f"Could not write session to {self.path}: {e}")
+
+
+class VideoOutput:
+    """
+    Plays the intro and win/lose videos fullscreen in one persistent mpv.
+
+    The intro and game over states last until their video ends (the player
+    posts VIDEO_FINISHED); without mpv they fall back to the engine timers.
+    With tasks (BackgroundTasks) set, starting mpv and sending it commands
+    happen on the background worker, never in the main loop.
+    """
+
+    def __init__(self, intro_video, win_video, lose_video, player=None, tasks=None):
+        self.intro_video = intro_video
+        self.win_video = win_video
+        self.lose_video = lose_video
+        self.player = player or MpvPlayer(on_clip_end=self.post_finished)
+        self.tasks = tasks
+        self.run(self.start_player)
+
+    def start_player(self):
+        if self.player.start():
+            self.player.preload([self.intro_video, self.win_video, self.lose_video])
+
+    def on_state_change(self, engine, old_state, new_state):
+        if new_state == PLAYING_INTRO:
+            self.play(engine, self.intro_video)
+        elif new_state == GAME_OVER:
+            # Replaces the intro if it is still playing
+            self.play(engine, self.win_video if engine.won else self.lose_video)
+
+    def render(self, engine):
+        pass
+
+    def play(self, engine, video):
+        """Play a video and make the engine wait for its end"""
+        clip = str(video)
+        engine.expect_video(clip)
+
+        def played(sent, error):
+            if error is not None or not sent:
+                engine.video_failed(clip)  # Back to the state's timer
+
+        self.run(self.player.play, clip, on_done=played)
+
+    def run(self, fn, *args, on_done=None):
+        """Run a player call on the background worker, or right away without one."""
+        if self.tasks is not None:
+            self.tasks.submit(fn, *args, on_done=on_done)
+            return
+        try:
+            result, error = fn(*args), None
+        except Exception as e:
+            result, error = None, e
+        if on_done is not None:
+            on_done(result, error)
+
+    @staticmethod
+    def post_finished(clip, reason):
+        # Called on the player's thread; the engine sees it with the other events
+        pygame.event.post(pygame.event.Event(VIDEO_FINISHED, clip=clip, reason=reason))
+
+    def close(self):
+        self.player.close()
@@ -0,0 +1,7 @@
+# Game states
+WAITING_FOR_START = "waiting_for_start"
+PLAYING_INTRO = "playing_intro"
+PLAYING_GAME = "playing_game"
+GAME_OVER = "game_over"
+SHOWING_FINAL_SCORE = "showing_final_score"  # New state for final score display
+SHOWING_WIN_LOSE_TEXT = "showing_win_lose_text"  # New state for win/lose text display
@@ -0,0 +1,28 @@
+"""
+Size of the tile floor, shared by the pattern generator, the renderer, hit
+testing and the serial tile indices.
+
+Set TILE_GRID=<rows>x<cols> in the environment (main.py --grid 6x10 does
+this) before the game modules are imported. arduino_sketch.ino must be built
+with the same GRID_ROWS and GRID_COLS.
+"""
+import os
+
+DEFAULT_GRID = "3x5"
+MAX_GRID_TILES = 256  # Tile indices are a single byte on the serial link
+MIN_GRID_TILES = 5  # A pattern lights up to 4 tiles, none on the last stump
+
+
+def parse_grid_size(text):
+    """Parse "<rows>x<cols>" into (rows, cols)."""
+    try:
+        rows, cols = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Grid size must look like 3x5, got {text!r}") from None
+    if rows < 1 or cols < 1 or not MIN_GRID_TILES <= rows * cols <= MAX_GRID_TILES:
+        raise ValueError(f"Grid size {text!r} must have {MIN_GRID_TILES} to {MAX_GRID_TILES} tiles")
+    return rows, cols
+
+
+GRID_ROWS, GRID_COLS = parse_grid_size(os.environ.get("TILE_GRID", DEFAULT_GRID))
+TOTAL_TILES = GRID_ROWS * GRID_COLS
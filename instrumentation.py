@@ -0,0 +1,212 @@
+import csv
+import json
+import os
+import time
+from array import array
+
+import pygame
+
+
+class RingBuffer:
+    """Fixed-size buffer of the last `capacity` float samples, preallocated."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = array("d", bytes(8 * capacity))
+        self.index = 0
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def last(self):
+        if not self.count:
+            return 0.0
+        return self.values[self.index - 1]
+
+    def summary(self):
+        """Return (p50, p95, max) of the samples held, 0.0 each when empty."""
+        if not self.count:
+            return (0.0, 0.0, 0.0)
+        ordered = sorted(self.values[:self.count])
+        n = len(ordered)
+        return (ordered[n // 2], ordered[min(n - 1, int(n * 0.95))], ordered[-1])
+
+
+class Instrumentation:
+    """
+    Timing of the main loop and the input/output paths, cheap enough to leave on.
+
+    Every metric keeps its last `capacity` samples (in milliseconds) in a
+    RingBuffer; nothing grows while the game runs. Summaries are computed on
+    demand, for the debug overlay and the periodic export.
+    """
+
+    metrics = ("frame", "update", "render", "flip", "press", "serial_write", "serial_queue")
+
+    def __init__(self, capacity=600, export_path=None, export_interval=10.0, max_export_bytes=1_000_000,
+                 tasks=None):
+        """
+        Args:
+            capacity: Samples kept per metric (600 = 20 s of frames at 30 fps)
+            export_path: File the summaries are appended to every export_interval
+                         seconds: CSV if it ends in .csv, JSON lines otherwise.
+                         None disables the export.
+            export_interval: Seconds between exported summaries
+            max_export_bytes: Size at which the export file is rotated to
+                              <export_path>.1 (one old file is kept)
+            tasks: BackgroundTasks to write the export file on (written in
+                   the calling thread if None)
+        """
+        self.buffers = {name: RingBuffer(capacity) for name in self.metrics}
+        self.frames = 0
+        self.presses = 0
+        self.serial_writes = 0
+        self.frame_flip_ms = 0.0  # Flip time of the frame being rendered
+
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.max_export_bytes = max_export_bytes
+        self.started = time.perf_counter()
+        self.last_export = self.started
+        self.tasks = tasks
+
+    def add_flip(self, seconds):
+        """Record time spent in pygame.display.update()/flip() during this frame."""
+        self.frame_flip_ms += seconds * 1000
+
+    def record_frame(self, frame, update, render):
+        """
+        Record one main loop iteration (all in seconds). render includes the
+        flips reported through add_flip(); they are stored separately.
+        """
+        flip_ms = self.frame_flip_ms
+        self.frame_flip_ms = 0.0
+        buffers = self.buffers
+        buffers["frame"].add(frame * 1000)
+        buffers["update"].add(update * 1000)
+        buffers["render"].add(render * 1000 - flip_ms)
+        buffers["flip"].add(flip_ms)
+        self.frames += 1
+
+    def record_press(self, seconds):
+        """Record the latency from a press arriving to it being scored."""
+        self.buffers["press"].add(seconds * 1000)
+        self.presses += 1
+
+    def record_serial_write(self, write_time, queue_time):
+        """
+        tile_comm write listener: time spent in serial write() and time the
+        update waited in the queue, in seconds. Called on the writer thread.
+        """
+        self.buffers["serial_write"].add(write_time * 1000)
+        self.buffers["serial_queue"].add(queue_time * 1000)
+        self.serial_writes += 1
+
+    def fps(self):
+        frame_ms = self.buffers["frame"].summary()[0]
+        return 1000 / frame_ms if frame_ms else 0.0
+
+    def summary(self):
+        """Flat dictionary of p50/p95/max per metric plus counters."""
+        summary = {
+            "time": round(time.time(), 3),
+            "uptime_s": round(time.perf_counter() - self.started, 1),
+            "fps": round(self.fps(), 1),
+            "frames": self.frames,
+            "presses": self.presses,
+            "serial_writes": self.serial_writes,
+        }
+        for name, buffer in self.buffers.items():
+            p50, p95, peak = buffer.summary()
+            summary[f"{name}_p50_ms"] = round(p50, 3)
+            summary[f"{name}_p95_ms"] = round(p95, 3)
+            summary[f"{name}_max_ms"] = round(peak, 3)
+        return summary
+
+    def maybe_export(self, now=None):
+        """Append a summary to the export file if export_interval has passed."""
+        if self.export_path is None:
+            return
+        now = time.perf_counter() if now is None else now
+        if now - self.last_export < self.export_interval:
+            return
+        self.last_export = now
+        summary = self.summary()
+        if self.tasks is None:
+            self.write_export(summary)
+        else:
+            self.tasks.submit(self.write_export, summary)
+
+    def write_export(self, summary):
+        try:
+            self.export(summary)
+        except OSError as e:
+            print(f"Could not write metrics to {self.export_path}: {e}")
+            self.export_path = None
+
+    def export(self, summary):
+        path = self.export_path
+        if os.path.exists(path) and os.path.getsize(path) > self.max_export_bytes:
+            os.replace(path, f"{path}.1")
+        new_file = not os.path.exists(path)
+        with open(path, "a", newline="") as f:
+            if str(path).endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=list(summary))
+                if new_file:
+                    writer.writeheader()
+                writer.writerow(summary)
+            else:
+                f.write(json.dumps(summary) + "\n")
+
+
+class DebugOverlay:
+    """Small panel with the live timings, drawn over the top-left corner."""
+
+    background = (0, 0, 0)
+    color = (0, 255, 0)
+    refresh_interval = 0.5  # Seconds between text updates
+
+    def __init__(self, instruments, assets, visible=False, pos=(5, 5)):
+        self.instruments = instruments
+        self.assets = assets
+        self.visible = visible
+        self.pos = pos
+        self.surface = None
+        self.last_refresh = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def lines(self):
+        instruments = self.instruments
+        lines = [f"{instruments.fps():5.1f} fps   p50 / p95 / max ms"]
+        for name in ("update", "render", "flip", "press", "serial_write"):
+            p50, p95, peak = instruments.buffers[name].summary()
+            lines.append(f"{name:<13}{p50:6.2f} {p95:6.2f} {peak:7.2f}")
+        return lines
+
+    def draw(self, screen):
+        """
+        Draw the panel, re-rendering its text at most every refresh_interval.
+
+        Returns:
+            The screen rect drawn
+        """
+        now = time.perf_counter()
+        if self.surface is None or now - self.last_refresh >= self.refresh_interval:
+            self.last_refresh = now
+            font = self.assets.get_font(20)
+            rendered = [font.render(line, True, self.color) for line in self.lines()]
+            line_height = font.get_linesize()
+            width = max(text.get_width() for text in rendered) + 8
+            if self.surface is not None:
+                width = max(width, self.surface.get_width())  # Never shrink and leave stale pixels
+            self.surface = pygame.Surface((width, line_height * len(rendered) + 8))
+            self.surface.fill(self.background)
+            for i, text in enumerate(rendered):
+                self.surface.blit(text, (4, 4 + i * line_height))
+        return screen.blit(self.surface, self.pos)
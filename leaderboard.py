@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    venue TEXT NOT NULL,
+    day TEXT NOT NULL,          -- Local date, YYYY-MM-DD
+    played_at REAL NOT NULL,    -- Unix time
+    score INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    misses INTEGER NOT NULL,
+    seed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_venue_score ON scores (venue, score DESC);
+CREATE INDEX IF NOT EXISTS scores_venue_day_score ON scores (venue, day, score DESC);
+CREATE INDEX IF NOT EXISTS scores_day ON scores (day);
+"""
+
+
+def day_of(played_at):
+    return time.strftime("%Y-%m-%d", time.localtime(played_at))
+
+
+class Leaderboard:
+    """
+    High scores of a venue, stored in SQLite (WAL mode).
+
+    add() only queues the score: a writer thread inserts the queued scores in
+    one transaction every batch_interval seconds and then refreshes the top
+    lists. top() returns those cached lists, so the attract screen can ask
+    every frame without touching the database; version changes whenever they do.
+    Top-N queries read the (venue, score) and (venue, day, score) indexes, so
+    they stay instant however many scores are stored.
+    """
+
+    def __init__(self, path, venue="", top_n=5, batch_interval=1.0):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            venue: Venue the scores are recorded and ranked for
+            top_n: Length of the top lists
+            batch_interval: Seconds between writes of the queued scores
+        """
+        self.path = path
+        self.venue = venue
+        self.top_n = top_n
+        self.batch_interval = batch_interval
+
+        self.pending = []
+        self.queued = 0  # Scores added so far
+        self.written = 0  # Of which written
+        self.condition = threading.Condition()
+        self.closing = False
+        self.today = None
+        self.tops = {"today": [], "all": []}  # Lists of (score, day), best first
+        self.version = 0
+
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    def add(self, score, hits=0, misses=0, seed=0, played_at=None):
+        """Queue a game's score; it is written and ranked on the writer thread."""
+        played_at = time.time() if played_at is None else played_at
+        with self.condition:
+            self.pending.append((self.venue, day_of(played_at), played_at, score, hits, misses, seed or 0))
+            self.queued += 1
+            self.condition.notify()
+
+    def top(self, scope="today"):
+        """Return the cached top list, "today" or "all" (time), as (score, day) tuples."""
+        return self.tops[scope]
+
+    def flush(self, timeout=5.0):
+        """Wait until the scores queued so far are written (for tools and tests)."""
+        deadline = time.perf_counter() + timeout
+        with self.condition:
+            target = self.queued
+            self.condition.notify()
+            while self.written < target and self.thread.is_alive() and time.perf_counter() < deadline:
+                self.condition.wait(0.05)
+
+    def close(self):
+        """Write the queued scores and stop the writer thread."""
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.thread.join(timeout=5.0)
+
+    def _write_loop(self):
+        try:
+            db = sqlite3.connect(self.path)
+        except sqlite3.Error as e:
+            print(f"Leaderboard disabled, could not open {self.path}: {e}")
+            return
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # Durable enough with WAL, no fsync per game
+            db.executescript(SCHEMA)
+            self._refresh(db)
+
+            while True:
+                with self.condition:
+                    if not self.pending and not self.closing:
+                        self.condition.wait(self.batch_interval)
+                    batch, closing = self.pending, self.closing
+                    self.pending = []
+                if batch:
+                    with db:
+                        db.executemany(
+                            "INSERT INTO scores (venue, day, played_at, score, hits, misses, seed)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            batch,
+                        )
+                if batch or self.today != day_of(time.time()):
+                    self._refresh(db)
+                with self.condition:
+                    self.written += len(batch)
+                    self.condition.notify_all()  # Wake flush()
+                if closing:
+                    return
+                if batch:
+                    time.sleep(self.batch_interval)  # Let a burst of games share one transaction
+        except sqlite3.Error as e:
+            print(f"Leaderboard error: {e}")
+        finally:
+            db.close()
+
+    def _refresh(self, db):
+        """Re-read the top lists from the indexes and publish them."""
+        self.today = day_of(time.time())
+        query = "SELECT score, day FROM scores WHERE venue = ?{} ORDER BY score DESC LIMIT ?"
+        today = db.execute(query.format(" AND day = ?"), (self.venue, self.today, self.top_n)).fetchall()
+        best = db.execute(query.format(""), (self.venue, self.top_n)).fetchall()
+        self.tops = {"today": today, "all": best}  # Replaced whole, readers never see a half update
+        self.version += 1
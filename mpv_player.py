@@ -0,0 +1,288 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+
+
+class MpvPlayer:
+    """
+    One long-lived mpv process playing clips fullscreen, controlled over its
+    JSON IPC socket (https://mpv.io/manual/stable/#json-ipc).
+
+    mpv idles without a window between clips, so switching clips is a single
+    loadfile command instead of a process start. on_clip_end(path, reason) is
+    called from the reader thread when a clip plays to its end ("eof") or
+    fails ("error"), not when it is replaced by another clip.
+
+    On Windows the IPC pipe is a synchronous file, where a command written
+    while the reader waits for an event would block until mpv sends one, so
+    there one mpv is started per clip instead and the end of a clip is its
+    process exiting.
+    """
+
+    args = [
+        "--idle=yes",
+        "--force-window=no",
+        "--fullscreen",
+        "--no-border",
+        "--ontop",
+        "--no-terminal",
+        "--keep-open=no",
+        "--no-osc",
+        "--cache=yes",
+    ]
+    # Without IPC: one process per clip, exiting at its end
+    clip_args = [arg for arg in args if arg not in ("--idle=yes", "--force-window=no")]
+
+    def __init__(self, on_clip_end=None, mpv="mpv", connect_timeout=5.0, ipc=None):
+        """
+        Args:
+            on_clip_end: Callback(path, reason), called on the reader thread
+            mpv: mpv executable
+            connect_timeout: Seconds to wait for mpv to open its IPC socket
+            ipc: Control one persistent mpv over IPC (default: everywhere but
+                 Windows, which starts one mpv per clip)
+        """
+        self.on_clip_end = on_clip_end
+        self.mpv = mpv
+        self.connect_timeout = connect_timeout
+        self.ipc = os.name != "nt" if ipc is None else ipc
+        if os.name == "nt":
+            self.ipc_path = rf"\\.\pipe\tile-game-mpv-{os.getpid()}"
+        else:
+            self.ipc_path = os.path.join(tempfile.gettempdir(), f"tile-game-mpv-{os.getpid()}.sock")
+
+        self.process = None
+        self.connection = None  # Socket (POSIX) or pipe file (Windows)
+        self.write_lock = threading.Lock()
+        self.unsent = []  # Commands issued before the IPC connection was up
+        self.reader_thread = None
+        self.closed = False
+
+        self.requested = deque()  # Clips loaded but not started yet
+        self.current = None  # Clip playing
+        self.current_entry = None  # Its playlist entry id
+
+        self.available = False  # Without IPC: mpv was found
+        self.clip_process = None  # Without IPC: process playing the current clip
+
+    def start(self):
+        """
+        Start mpv in the background; the IPC connection is made on a thread.
+
+        Returns:
+            True if mpv was started, False if it is not installed
+        """
+        if not self.ipc:
+            self.available = shutil.which(self.mpv) is not None
+            if not self.available:
+                print(f"Video disabled, could not find {self.mpv}")
+            return self.available
+        if self.process is not None:
+            return True
+        try:
+            self.process = subprocess.Popen(
+                [self.mpv, *self.args, f"--input-ipc-server={self.ipc_path}"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except (FileNotFoundError, PermissionError) as e:
+            print(f"Video disabled, could not start {self.mpv}: {e}")
+            return False
+        self.reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self.reader_thread.start()
+        return True
+
+    def is_running(self):
+        if not self.ipc:
+            return self.available and not self.closed
+        return self.process is not None and self.process.poll() is None
+
+    def preload(self, paths):
+        """Read the clips once on a background thread, so the first play doesn't wait on the disk."""
+        def read_all():
+            for path in paths:
+                try:
+                    with open(path, "rb") as f:
+                        while f.read(1 << 20):
+                            pass
+                except OSError as e:
+                    print(f"Could not preload {path}: {e}")
+        threading.Thread(target=read_all, daemon=True).start()
+
+    def play(self, path):
+        """
+        Play a clip, replacing the one playing.
+
+        Returns:
+            True if the clip was sent to mpv, False if mpv is not running
+        """
+        if not self.is_running():
+            return False
+        path = str(path)
+        if not self.ipc:
+            return self._play_process(path)
+        with self.write_lock:
+            self.requested.append(path)
+        self.command("loadfile", path, "replace")
+        return True
+
+    def stop(self):
+        """Stop playback; mpv goes back to idle and closes its window."""
+        if not self.ipc:
+            self._stop_process()
+            return
+        with self.write_lock:
+            self.requested.clear()
+            self.current = None
+        self.command("stop")
+
+    def command(self, *args):
+        """Send an IPC command (queued until the connection is up)."""
+        data = (json.dumps({"command": list(args)}) + "\n").encode("utf-8")
+        with self.write_lock:
+            if self.connection is None:
+                self.unsent.append(data)
+                return
+            try:
+                self._send(data)
+            except OSError as e:
+                print(f"mpv IPC error: {e}")
+
+    def close(self):
+        """Quit mpv."""
+        self.closed = True
+        if not self.ipc:
+            self._stop_process()
+            return
+        if self.is_running():
+            self.command("quit")
+            try:
+                self.process.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                self.process.terminate()
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except OSError:
+                pass
+        if os.name != "nt" and os.path.exists(self.ipc_path):
+            try:
+                os.remove(self.ipc_path)
+            except OSError:
+                pass
+
+    def _play_process(self, path):
+        """Start an mpv for the clip, replacing the one playing."""
+        self._stop_process()
+        try:
+            process = subprocess.Popen(
+                [self.mpv, *self.clip_args, path],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except (FileNotFoundError, PermissionError) as e:
+            print(f"Could not start {self.mpv}: {e}")
+            return False
+        with self.write_lock:
+            self.clip_process = process
+        threading.Thread(target=self._wait_process, args=(process, path), daemon=True).start()
+        return True
+
+    def _stop_process(self):
+        """Stop the clip playing without reporting its end."""
+        with self.write_lock:
+            process, self.clip_process = self.clip_process, None
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def _wait_process(self, process, path):
+        returncode = process.wait()
+        with self.write_lock:
+            if process is not self.clip_process:
+                return  # Replaced or stopped
+            self.clip_process = None
+        if self.on_clip_end is not None:
+            self.on_clip_end(path, "eof" if returncode == 0 else "error")
+
+    def _send(self, data):
+        if os.name == "nt":
+            self.connection.write(data)
+            self.connection.flush()
+        else:
+            self.connection.sendall(data)
+
+    def _connect(self):
+        """Connect to the IPC socket once mpv has created it."""
+        deadline = time.perf_counter() + self.connect_timeout
+        while time.perf_counter() < deadline and self.is_running() and not self.closed:
+            try:
+                if os.name == "nt":
+                    connection = open(self.ipc_path, "r+b", buffering=0)
+                else:
+                    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    connection.connect(self.ipc_path)
+                return connection
+            except OSError:
+                time.sleep(0.05)
+        return None
+
+    def _reader_loop(self):
+        connection = self._connect()
+        if connection is None:
+            print("Could not connect to mpv, video disabled")
+            self._finish_current("error")
+            return
+
+        with self.write_lock:
+            self.connection = connection
+            for data in self.unsent:
+                try:
+                    self._send(data)
+                except OSError as e:
+                    print(f"mpv IPC error: {e}")
+            self.unsent.clear()
+
+        reader = connection if os.name == "nt" else connection.makefile("rb")
+        try:
+            for line in reader:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                self._handle_event(message)
+        except OSError:
+            pass
+        # mpv exited: don't leave the game waiting for the clip
+        if not self.closed:
+            self._finish_current("error")
+
+    def _handle_event(self, message):
+        event = message.get("event")
+        if event == "start-file":
+            with self.write_lock:
+                if self.requested:
+                    self.current = self.requested.popleft()
+                self.current_entry = message.get("playlist_entry_id")
+        elif event == "end-file":
+            entry = message.get("playlist_entry_id")
+            if entry is not None and self.current_entry is not None and entry != self.current_entry:
+                return
+            reason = message.get("reason")
+            if reason in ("eof", "error"):
+                self._finish_current(reason)
+
+    def _finish_current(self, reason):
+        with self.write_lock:
+            clip, self.current = self.current, None
+            if clip is None and self.requested:
+                clip = self.requested.popleft()  # Failed before it started
+        if clip is not None and self.on_clip_end is not None:
+            self.on_clip_end(clip, reason)
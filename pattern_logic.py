@@ -1,82 +1,200 @@
 import random
 
+from grid_config import GRID_ROWS, GRID_COLS
 
-def generate_pattern(difficulty, last_stump_pos=None, total_patterns_played=0):
+MIN_TILES = 2
+MAX_TILES = 4
+MAX_DIFFICULTY = 5
+MAX_STUMP_DISTANCE = 2  # Manhattan distance a new stump may be from the last one
+FREE_MOVE_AFTER = 17  # From this pattern on, the distance restriction is dropped
+
+
+class PatternTables:
     """
-    Generate a tile pattern for a 3x5 grid based on difficulty.
-    - Always at least one "stump" and one "rock"
-    - Total number of tiles is 2 to 4
-    - At low difficulty, more stumps than rocks
-    - At high difficulty, more rocks than stumps
-    - Never place two types on the same tile
-    - Never exceed 4 lit tiles total
-    - Valid positions: (row, col) with row in 0-2, col in 0-4
-    - New stump must be different from last stump position
-    - New stump must be at least 2 Manhattan distance away (except in last 3 patterns)
-    - Allow 1-step diagonals (Manhattan distance = 2)
-    - In last 3 patterns, drop distance restriction entirely
+    Lookup tables for one grid size, computed once and shared by every
+    generate_pattern() call.
+
+    Tiles are numbered row-major (index = row * cols + col); a set of tiles
+    is a bitmask with bit `index` set for each tile in it.
     """
-    rows, cols = 3, 5
-    all_positions = [(r, c) for r in range(rows) for c in range(cols)]
 
-    # Determine total number of tiles (2 to 4)
-    # At low difficulty, fewer tiles; at high, more
-    min_tiles = 2
-    max_tiles = 4
-    max_difficulty = 5
+    def __init__(self, rows=GRID_ROWS, cols=GRID_COLS):
+        self.rows = rows
+        self.cols = cols
+        self.positions = tuple((r, c) for r in range(rows) for c in range(cols))
+        self.index_of = {pos: i for i, pos in enumerate(self.positions)}
+        self.all_mask = (1 << len(self.positions)) - 1
+
+        # distance[i][j]: Manhattan distance between tiles i and j
+        self.distance = [
+            [abs(r1 - r2) + abs(c1 - c2) for (r2, c2) in self.positions]
+            for (r1, c1) in self.positions
+        ]
+        # reachable[i]: tiles other than i within MAX_STUMP_DISTANCE of it
+        self.reachable = [
+            sum(1 << j for j, d in enumerate(row) if 0 < d <= MAX_STUMP_DISTANCE)
+            for row in self.distance
+        ]
+        self.reachable_count = [bin(mask).count("1") for mask in self.reachable]
+        # others[i]: every tile except i
+        self.others = [self.all_mask & ~(1 << i) for i in range(len(self.positions))]
+
+        self._candidates = {}
 
-    # Scale number of tiles with difficulty (1 = easy, max_difficulty = hard)
-    num_tiles = min_tiles + (max_tiles - min_tiles) * (difficulty - 1) // (max_difficulty - 1)
-    num_tiles = max(min(num_tiles, max_tiles), min_tiles)
+    def candidates(self, mask):
+        """Return the positions in a bitmask as a row-major tuple (cached per mask)."""
+        positions = self._candidates.get(mask)
+        if positions is None:
+            positions = tuple(pos for i, pos in enumerate(self.positions) if mask >> i & 1)
+            self._candidates[mask] = positions
+        return positions
+
+    def stump_candidates(self, last_stump_pos, total_patterns_played, num_tiles=1):
+        """
+        Bitmask of the tiles a pattern of num_tiles tiles may use after a
+        stump at last_stump_pos.
+        """
+        last = self.index_of.get(last_stump_pos) if last_stump_pos is not None else None
+        if last is None:
+            return self.all_mask
+        # Never reuse the last stump position
+        mask = self.others[last]
+        # Small grids: when too few tiles are close, any other tile will do
+        if total_patterns_played < FREE_MOVE_AFTER and self.reachable_count[last] >= num_tiles:
+            # Stay close to the last stump (1-step diagonals allowed)
+            mask = self.reachable[last]
+        return mask
+
+
+_tables = {}
+
+def get_pattern_tables(rows=GRID_ROWS, cols=GRID_COLS):
+    """Return the PatternTables for a grid size, computing them once per size."""
+    key = (rows, cols)
+    tables = _tables.get(key)
+    if tables is None:
+        tables = PatternTables(rows, cols)
+        _tables[key] = tables
+    return tables
+
+
+def _compute_tile_split(difficulty):
+    # Scale number of tiles with difficulty (1 = easy, MAX_DIFFICULTY = hard)
+    num_tiles = MIN_TILES + (MAX_TILES - MIN_TILES) * (difficulty - 1) // (MAX_DIFFICULTY - 1)
+    num_tiles = max(min(num_tiles, MAX_TILES), MIN_TILES)
 
     # Always at least one stump and one rock
-    # Decide how many of each
-    if difficulty <= (max_difficulty // 2):
+    if difficulty <= (MAX_DIFFICULTY // 2):
         # Low difficulty: more stumps
         num_stumps = max(1, num_tiles - 1)
-        num_rocks = num_tiles - num_stumps
     else:
         # High difficulty: more rocks
-        num_rocks = max(1, num_tiles - 1)
-        num_stumps = num_tiles - num_rocks
-
-    # Filter available positions for stump based on last stump position
-    available_positions = all_positions.copy()
-    
-    if last_stump_pos is not None:
-        # Remove the last stump position to avoid reusing it
-        if last_stump_pos in available_positions:
-            available_positions.remove(last_stump_pos)
-        
-        # Check if we're in the last 3 patterns (drop distance restriction)
-        # Assuming game duration is 60 seconds and pattern interval is 3-1.5 seconds
-        # Roughly 20-40 patterns per game, so last 3 patterns would be around patterns 17+
-        is_last_3_patterns = total_patterns_played >= 17
-        
-        if not is_last_3_patterns:
-            # Filter positions to only those with Manhattan distance >= 2
-            # This allows 1-step diagonals (distance = 2) but prevents adjacent moves
-            reachable_positions = []
-            for pos in available_positions:
-                # Calculate Manhattan distance
-                distance = abs(pos[0] - last_stump_pos[0]) + abs(pos[1] - last_stump_pos[1])
-                
-                if distance <= 2:  # At most 2 Manhattan distance away
-                    reachable_positions.append(pos)
-            
-            # If no reachable positions, fall back to all available positions
-            if reachable_positions:
-                available_positions = reachable_positions
+        num_stumps = num_tiles - max(1, num_tiles - 1)
+    return num_tiles, num_stumps
+
+# (total tiles, stumps) per difficulty level
+TILE_SPLITS = {difficulty: _compute_tile_split(difficulty) for difficulty in range(1, MAX_DIFFICULTY + 1)}
+
+def tile_split(difficulty):
+    """Return (total tiles, stumps) for a difficulty level."""
+    split = TILE_SPLITS.get(difficulty)
+    return split if split is not None else _compute_tile_split(difficulty)
+
+
+def generate_pattern(difficulty, last_stump_pos=None, total_patterns_played=0, rng=None,
+                     rows=GRID_ROWS, cols=GRID_COLS):
+    """
+    Generate a tile pattern for a rows x cols grid based on difficulty.
+    - Always at least one "stump" and one "rock"
+    - Total number of tiles is 2 to 4
+    - At low difficulty, more stumps than rocks
+    - At high difficulty, more rocks than stumps
+    - Never place two types on the same tile
+    - Never exceed 4 lit tiles total
+    - Valid positions: (row, col) with row in 0..rows-1, col in 0..cols-1
+    - New stump must be different from last stump position
+    - New tiles must be at most 2 Manhattan distance away from the last stump
+      (1-step diagonals allowed)
+    - From pattern 17 on (the end of the game), drop the distance restriction
+
+    rng is the random.Random to draw from (the random module by default).
+    """
+    tables = get_pattern_tables(rows, cols)
+    num_tiles, num_stumps = tile_split(difficulty)
+
+    available_positions = tables.candidates(
+        tables.stump_candidates(last_stump_pos, total_patterns_played, num_tiles))
 
     # Randomly select unique positions for stumps and rocks
-    positions = random.sample(available_positions, num_tiles)
-    stump_positions = positions[:num_stumps]
-    rock_positions = positions[num_stumps:]
+    positions = (rng or random).sample(available_positions, num_tiles)
 
     pattern = {}
-    for pos in stump_positions:
+    for pos in positions[:num_stumps]:
         pattern[pos] = "stump"
-    for pos in rock_positions:
+    for pos in positions[num_stumps:]:
         pattern[pos] = "rock"
 
-    return pattern
\ No newline at end of file
+    return pattern
+
+
+def generate_patterns(difficulties, last_stump_pos=None, first_pattern=1, rng=None,
+                      rows=GRID_ROWS, cols=GRID_COLS):
+    """
+    Generate a whole sequence of patterns in one call, as the game would
+    show them one after the other.
+
+    Args:
+        difficulties: Difficulty of each pattern, in order
+        last_stump_pos: Stump position before the first pattern
+        first_pattern: Number of the first pattern (the game counts from 1)
+        rng: random.Random to draw from (the random module by default)
+        rows, cols: Grid dimensions
+
+    Returns:
+        List of patterns
+    """
+    tables = get_pattern_tables(rows, cols)
+    rng = rng or random
+    sample = rng.sample
+    patterns = []
+    for number, difficulty in enumerate(difficulties, first_pattern):
+        num_tiles, num_stumps = tile_split(difficulty)
+        positions = sample(tables.candidates(tables.stump_candidates(last_stump_pos, number, num_tiles)), num_tiles)
+
+        pattern = {}
+        for pos in positions[:num_stumps]:
+            pattern[pos] = "stump"
+        for pos in positions[num_stumps:]:
+            pattern[pos] = "rock"
+        patterns.append(pattern)
+
+        if num_stumps:
+            last_stump_pos = positions[0]
+    return patterns
+
+
+def validate_patterns(patterns, difficulties, last_stump_pos=None, first_pattern=1,
+                      rows=GRID_ROWS, cols=GRID_COLS):
+    """
+    Check a pattern sequence against the generation rules.
+
+    Returns:
+        List of (pattern number, problem) tuples, empty if every pattern is valid
+    """
+    tables = get_pattern_tables(rows, cols)
+    problems = []
+    for number, (pattern, difficulty) in enumerate(zip(patterns, difficulties), first_pattern):
+        num_tiles, num_stumps = tile_split(difficulty)
+        stumps = [pos for pos, kind in pattern.items() if kind == "stump"]
+        if len(pattern) != num_tiles or len(stumps) != num_stumps:
+            problems.append((number, f"expected {num_stumps} stumps in {num_tiles} tiles"))
+
+        allowed = tables.stump_candidates(last_stump_pos, number, num_tiles)
+        for pos in pattern:
+            index = tables.index_of.get(pos)
+            if index is None or not allowed >> index & 1:
+                problems.append((number, f"tile {pos} not allowed after stump {last_stump_pos}"))
+
+        if stumps:
+            last_stump_pos = stumps[0]
+    return problems
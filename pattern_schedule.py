@@ -0,0 +1,128 @@
+import json
+import random
+from array import array
+
+from grid_config import GRID_ROWS, GRID_COLS
+from pattern_logic import generate_patterns, MAX_DIFFICULTY
+
+SCHEDULE_VERSION = 1
+
+
+class PatternSchedule:
+    """
+    Every pattern of one game and the game time it is shown at, generated
+    before the game starts from a per-session seed.
+
+    The same seed and settings always produce the same schedule, and a
+    schedule saved as JSON replays exactly.
+    """
+
+    def __init__(self, seed, game_duration, times, difficulties, patterns, settings=None):
+        """
+        Args:
+            seed: Seed the patterns were drawn with
+            game_duration: Game length in ms
+            times: Game time (ms from the start of the game) each pattern is shown
+            difficulties: Difficulty of each pattern
+            patterns: The patterns, dictionaries of (row, col) -> "stump"/"rock"
+            settings: Timing settings the schedule was generated with
+        """
+        self.seed = seed
+        self.game_duration = game_duration
+        self.times = array("l", times)
+        self.difficulties = array("b", difficulties)
+        self.patterns = patterns
+        self.settings = settings or {}
+
+    def __len__(self):
+        return len(self.patterns)
+
+    @property
+    def grid_size(self):
+        """(rows, cols) the schedule was generated for."""
+        return (self.settings.get("rows", 3), self.settings.get("cols", 5))
+
+    @classmethod
+    def generate(cls, seed=None, game_duration=120000, pattern_interval=3000, min_pattern_interval=1500,
+                 interval_step=300, difficulty_interval=12000, max_difficulty=MAX_DIFFICULTY,
+                 rows=GRID_ROWS, cols=GRID_COLS):
+        """
+        Build the schedule of a game.
+
+        Difficulty goes up by one every difficulty_interval ms up to
+        max_difficulty; each pattern stays up for pattern_interval ms, minus
+        interval_step per difficulty level above 1, but at least
+        min_pattern_interval. The first pattern comes after one interval.
+
+        Args:
+            seed: Seed for the patterns (a random one if None)
+            game_duration: Game length in ms, no pattern is shown after it
+            rows, cols: Grid dimensions
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+        settings = {
+            "pattern_interval": pattern_interval,
+            "min_pattern_interval": min_pattern_interval,
+            "interval_step": interval_step,
+            "difficulty_interval": difficulty_interval,
+            "max_difficulty": max_difficulty,
+            "rows": rows,
+            "cols": cols,
+        }
+
+        times = []
+        difficulties = []
+        t = 0
+        difficulty = 1
+        while True:
+            t += max(min_pattern_interval, pattern_interval - (difficulty - 1) * interval_step)
+            if t >= game_duration:
+                break
+            difficulty = min(1 + t // difficulty_interval, max_difficulty)
+            times.append(t)
+            difficulties.append(difficulty)
+
+        patterns = generate_patterns(difficulties, rng=random.Random(seed), rows=rows, cols=cols)
+        return cls(seed, game_duration, times, difficulties, patterns, settings)
+
+    def next_index(self, elapsed, index):
+        """Return the index of the pattern to show at elapsed ms, starting the search at index."""
+        times = self.times
+        while index + 1 < len(times) and times[index + 1] <= elapsed:
+            index += 1
+        return index
+
+    def to_dict(self):
+        return {
+            "version": SCHEDULE_VERSION,
+            "seed": self.seed,
+            "game_duration": self.game_duration,
+            "settings": self.settings,
+            "times": list(self.times),
+            "difficulties": list(self.difficulties),
+            "patterns": [
+                [[row, col, kind] for (row, col), kind in pattern.items()]
+                for pattern in self.patterns
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != SCHEDULE_VERSION:
+            raise ValueError(f"Unsupported schedule version: {data.get('version')}")
+        patterns = [
+            {(row, col): kind for row, col, kind in pattern}
+            for pattern in data["patterns"]
+        ]
+        return cls(data["seed"], data["game_duration"], data["times"], data["difficulties"],
+                   patterns, data.get("settings"))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
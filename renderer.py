@@ -0,0 +1,145 @@
+import pygame
+
+from game_states import WAITING_FOR_START, PLAYING_GAME, SHOWING_FINAL_SCORE
+from tile_logic import draw_tile_grid
+
+
+class GameplayRenderer:
+    """
+    Retained-mode renderer for the gameplay screen (logo, tile grid, scoreboard).
+
+    The grid and scoreboard are drawn into persistent surfaces and only redrawn
+    when what they show changes. render() returns the screen rects that changed,
+    to be passed to pygame.display.update().
+    """
+
+    background = (0, 0, 0)
+    ui_background = (169, 169, 169)
+    corner_radius = 15
+
+    def __init__(self, screen, assets, logo_path, logo_rect, grid_rect, ui_rect):
+        """
+        Args:
+            screen: Pygame display surface
+            assets: AssetCache used for the logo and text
+            logo_path: Path of the logo image
+            logo_rect, grid_rect, ui_rect: Screen areas of the logo, the tile
+                                           grid and the scoreboard
+        """
+        self.screen = screen
+        self.assets = assets
+        self.logo_path = logo_path
+        self.logo_rect = pygame.Rect(logo_rect)
+        self.grid_rect = pygame.Rect(grid_rect)
+        self.ui_rect = pygame.Rect(ui_rect)
+
+        self.grid_surface = pygame.Surface(self.grid_rect.size)
+        self.ui_surface = pygame.Surface(self.ui_rect.size, pygame.SRCALPHA)
+
+        self.drawn_tiles = None
+        self.drawn_ui = None
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Redraw everything on the next render, e.g. after a fullscreen screen."""
+        self.full_redraw = True
+
+    def render(self, game_state, active_tiles, tracker):
+        """
+        Bring the gameplay screen up to date.
+
+        Returns:
+            List of changed screen rects (empty if nothing changed)
+        """
+        dirty_rects = []
+        full_redraw = self.full_redraw
+        self.full_redraw = False
+
+        if full_redraw:
+            self.screen.fill(self.background)
+            self._draw_logo()
+            dirty_rects.append(self.screen.get_rect())
+
+        grid_changed = full_redraw or active_tiles != self.drawn_tiles
+        if grid_changed:
+            self.grid_surface.fill(self.background)
+            draw_tile_grid(self.grid_surface, active_tiles)
+            self.drawn_tiles = dict(active_tiles)
+            self.screen.blit(self.grid_surface, self.grid_rect)
+            dirty_rects.append(self.grid_rect)
+
+        ui_state = (game_state, tracker.score, tracker.hits, tracker.misses)
+        ui_changed = ui_state != self.drawn_ui
+        if ui_changed:
+            self._draw_ui(*ui_state)
+            self.drawn_ui = ui_state
+
+        # The scoreboard overlaps the bottom of the grid: redraw it whenever
+        # the grid changed, and restore the grid under it when it changed
+        if grid_changed or ui_changed:
+            self.screen.set_clip(self.ui_rect)
+            self.screen.fill(self.background)
+            self.screen.blit(self.grid_surface, self.grid_rect)
+            self.screen.blit(self.ui_surface, self.ui_rect)
+            self.screen.set_clip(None)
+            dirty_rects.append(self.ui_rect)
+
+        return dirty_rects
+
+    def _draw_logo(self):
+        """Draws the logo from an image file."""
+        size = self.logo_rect.height
+        logo_img = self.assets.get_image(self.logo_path, (size, size)) # Assuming square logo for scaling
+        if logo_img is None:
+            # Fallback to text if image fails to load
+            logo_img = self.assets.render_text("Logo Image Not Found", 40, (255, 0, 0))
+        self.screen.blit(logo_img, logo_img.get_rect(center=self.logo_rect.center))
+
+    def _draw_ui(self, game_state, score, hits, misses):
+        """Draw the scoreboard into its persistent surface."""
+        ui_surface = self.ui_surface
+        ui_surface_width, ui_surface_height = ui_surface.get_size()
+        assets = self.assets
+
+        # Draw the rounded background
+        ui_surface.fill((0, 0, 0, 0))
+        pygame.draw.rect(ui_surface, self.ui_background, ui_surface.get_rect(), border_radius=self.corner_radius)
+
+        if game_state == WAITING_FOR_START:
+            # Show start instructions
+            text1 = assets.render_text("Press the lit bottom tile", 36, (255, 255, 255))
+            text2 = assets.render_text("to start the game!", 36, (255, 255, 255))
+            text1_rect = text1.get_rect(center=(ui_surface_width // 2, ui_surface_height // 2 - 20))
+            text2_rect = text2.get_rect(center=(ui_surface_width // 2, ui_surface_height // 2 + 20))
+            ui_surface.blit(text1, text1_rect)
+            ui_surface.blit(text2, text2_rect)
+
+        elif game_state == PLAYING_GAME:
+            # Display score, hits, and misses during gameplay
+            # Score at the top
+            score_text = assets.render_text(f"Score: {score}", 50, (255, 255, 255))
+            score_rect = score_text.get_rect(center=(ui_surface_width // 2, ui_surface_height // 2 - 30))
+            ui_surface.blit(score_text, score_rect)
+
+            # Hits and misses below
+            hits_text = assets.render_text(f"Hits: {hits}", 36, (0, 255, 0))
+            misses_text = assets.render_text(f"Misses: {misses}", 36, (255, 0, 0))
+
+            hits_rect = hits_text.get_rect(center=(ui_surface_width // 2 - 80, ui_surface_height // 2 + 20))
+            misses_rect = misses_text.get_rect(center=(ui_surface_width // 2 + 80, ui_surface_height // 2 + 20))
+
+            ui_surface.blit(hits_text, hits_rect)
+            ui_surface.blit(misses_text, misses_rect)
+
+        elif game_state == SHOWING_FINAL_SCORE:
+            # Draw final score, hits, and misses
+            score_text = assets.render_text(f"Final Score: {score}", 48, (255, 255, 255))
+            score_rect = score_text.get_rect(center=(ui_surface_width // 2, ui_surface_height // 2 - 60))
+            ui_surface.blit(score_text, score_rect)
+
+            hits_text = assets.render_text(f"Hits: {hits}", 32, (0, 255, 0))
+            misses_text = assets.render_text(f"Misses: {misses}", 32, (255, 0, 0))
+            hits_rect = hits_text.get_rect(center=(ui_surface_width // 2, ui_surface_height // 2 + 20))
+            misses_rect = misses_text.get_rect(center=(ui_surface_width // 2, ui_surface_height // 2 + 60))
+            ui_surface.blit(hits_text, hits_rect)
+            ui_surface.blit(misses_text, misses_rect)
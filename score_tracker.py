@@ -1,35 +1,110 @@
+import time
+
+from scoring import Scoring, ReactionHistogram
+from session_log import SessionLog, PATTERN, HIT, ROCK, EMPTY
+
 
 class ScoreTracker:
-    def __init__(self):
+    def __init__(self, log=None, scoring=None):
+        """
+        Args:
+            log: SessionLog to record the game in (a new one by default)
+            scoring: Scoring for the points of a press (classic +2 / -1 by default)
+        """
         self.score = 0
         self.hits = 0
         self.misses = 0
+        self.streak = 0  # hits in a row
+        self.best_streak = 0
+        self.last_reaction_ms = None  # pattern shown to the last scored press
         self.pattern_scored = False  # only score once per pattern
+        self.pattern_shown_at = None  # when the current pattern appeared
+        self.previous_tiles = None  # pattern shown before the current one
+        self.previous_shown_at = None
+        self.previous_scored = True
+        self.scoring = scoring or Scoring()
+        self.reactions = ReactionHistogram()  # This player's reaction times (hits)
+        self.log = log if log is not None else SessionLog()  # Patterns shown and presses scored this game
 
     def reset(self):
         self.score = 0
         self.hits = 0
         self.misses = 0
+        self.streak = 0
+        self.best_streak = 0
+        self.last_reaction_ms = None
+        self.pattern_scored = False
+        self.pattern_shown_at = None
+        self.previous_tiles = None
+        self.previous_shown_at = None
+        self.previous_scored = True
+        self.reactions.reset()
+        self.log.clear()
+
+    def finish_session(self, seed=0, venue=""):
+        """Return the session log of the game (see SessionLog.finish) and start a new one."""
+        return self.log.finish(self.score, self.hits, self.misses, seed=seed, venue=venue)
+
+    def start_pattern(self, old_tiles, shown_at, tiles=None, difficulty=0):
+        """
+        Start scoring a new pattern shown at time shown_at.
+        Presses timestamped before shown_at still count against old_tiles.
+        tiles and difficulty of the new pattern are only logged.
+        """
+        stump = None
+        if tiles:
+            stump = next((tile for tile, kind in tiles.items() if kind == "stump"), None)
+        self.log.add(PATTERN, shown_at, stump, difficulty)
+        self.previous_tiles = old_tiles
+        self.previous_scored = self.pattern_scored
+        self.previous_shown_at = self.pattern_shown_at
+        self.pattern_shown_at = shown_at
         self.pattern_scored = False
 
-    def check_tile_press(self, pressed_tile, active_tiles):
+    def check_tile_press(self, pressed_tile, active_tiles, press_time=None):
         """
         Updates score and flags based on tile press.
+        If press_time is given, a press made before the current pattern
+        appeared is scored against the previous pattern instead.
+        The points come from the scoring, given the reaction time (ms from
+        the pattern appearing to press_time, now if None) and the streak.
         Returns True if scored, False if already scored or no press.
         """
-        if self.pattern_scored or pressed_tile is None:
+        if pressed_tile is None:
             return False
+        if press_time is None:
+            press_time = time.perf_counter()
 
-        if pressed_tile in active_tiles:
-            if active_tiles[pressed_tile] == "stump":
-                self.score += 2
-                self.hits += 1
-            else:
-                self.score -= 1
-                self.misses += 1
-        else:
-            self.score -= 1
-            self.misses += 1
+        if self.pattern_shown_at is not None and press_time < self.pattern_shown_at:
+            if self.previous_scored or self.previous_tiles is None:
+                return False
+            self._score_press(pressed_tile, self.previous_tiles, press_time, self.previous_shown_at)
+            self.previous_scored = True
+            return True
 
+        if self.pattern_scored:
+            return False
+
+        self._score_press(pressed_tile, active_tiles, press_time, self.pattern_shown_at)
         self.pattern_scored = True
         return True
+
+    def _score_press(self, pressed_tile, active_tiles, press_time, shown_at):
+        kind = EMPTY
+        if pressed_tile in active_tiles:
+            kind = HIT if active_tiles[pressed_tile] == "stump" else ROCK
+        reaction_ms = round((press_time - shown_at) * 1000) if shown_at is not None else 0
+
+        if kind == HIT:
+            self.hits += 1
+            self.streak += 1
+            if self.streak > self.best_streak:
+                self.best_streak = self.streak
+            self.reactions.add(reaction_ms)
+        else:
+            self.misses += 1
+            self.streak = 0
+        points = self.scoring.points(kind, reaction_ms, self.streak)
+        self.score += points
+        self.last_reaction_ms = reaction_ms
+        self.log.add(kind, press_time, pressed_tile, points)
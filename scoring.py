@@ -0,0 +1,118 @@
+from array import array
+
+from session_log import HIT
+
+
+class Scoring:
+    """
+    Points for a scored press: hit (stump) or miss (rock or empty tile),
+    then passed through each curve in turn.
+
+    A curve is any object with apply(points, kind, reaction_ms, streak)
+    returning the new points; kind is session_log.HIT, ROCK or EMPTY and
+    streak counts the hits in a row including this one (0 on a miss).
+    Without curves this is the classic +2 / -1.
+    """
+
+    def __init__(self, hit=2, miss=-1, curves=()):
+        self.hit = hit
+        self.miss = miss
+        self.curves = tuple(curves)
+
+    def points(self, kind, reaction_ms, streak):
+        points = self.hit if kind == HIT else self.miss
+        for curve in self.curves:
+            points = curve.apply(points, kind, reaction_ms, streak)
+        return points
+
+
+class SpeedBonus:
+    """Extra points for fast hits: max_bonus up to fast_ms, falling linearly to 0 at slow_ms."""
+
+    def __init__(self, max_bonus=3, fast_ms=400, slow_ms=1500):
+        self.max_bonus = max_bonus
+        self.fast_ms = fast_ms
+        self.slow_ms = slow_ms
+
+    def apply(self, points, kind, reaction_ms, streak):
+        if kind != HIT or reaction_ms >= self.slow_ms:
+            return points
+        if reaction_ms <= self.fast_ms:
+            return points + self.max_bonus
+        return points + self.max_bonus * (self.slow_ms - reaction_ms) // (self.slow_ms - self.fast_ms)
+
+
+class StreakMultiplier:
+    """Hits count x2 from `step` hits in a row, x3 from 2 * step, ... up to max_multiplier."""
+
+    def __init__(self, step=5, max_multiplier=3):
+        self.step = step
+        self.max_multiplier = max_multiplier
+
+    def apply(self, points, kind, reaction_ms, streak):
+        if kind != HIT:
+            return points
+        return points * min(1 + streak // self.step, self.max_multiplier)
+
+
+SCORING_CURVES = {
+    "speed": SpeedBonus,
+    "streak": StreakMultiplier,
+}
+
+
+def make_scoring(names=""):
+    """Build a Scoring from curve names, e.g. "speed,streak" ("" or "flat" for none)."""
+    curves = []
+    for name in filter(None, (part.strip() for part in names.split(","))):
+        if name == "flat":
+            continue
+        if name not in SCORING_CURVES:
+            raise ValueError(f"Unknown scoring curve {name!r}, expected one of {', '.join(SCORING_CURVES)}")
+        curves.append(SCORING_CURVES[name]())
+    return Scoring(curves=curves)
+
+
+class ReactionHistogram:
+    """
+    Reaction times in bucket_ms wide buckets up to max_ms (slower ones land
+    in the last bucket). Adding a time is O(1); percentiles are read from
+    the counts, so no sample is kept and nothing is sorted.
+    """
+
+    def __init__(self, bucket_ms=5, max_ms=5000):
+        self.bucket_ms = bucket_ms
+        self.counts = array("l", bytes(array("l").itemsize * (max_ms // bucket_ms + 1)))
+        self.count = 0
+        self.total_ms = 0
+        self.fastest = None
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total_ms = 0
+        self.fastest = None
+
+    def add(self, reaction_ms):
+        reaction_ms = max(reaction_ms, 0)
+        self.counts[min(reaction_ms // self.bucket_ms, len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total_ms += reaction_ms
+        if self.fastest is None or reaction_ms < self.fastest:
+            self.fastest = reaction_ms
+
+    def mean(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """Return the upper edge (ms) of the bucket holding the p-th percentile (0 if empty)."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))  # Ceiling, at least the first sample
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return (bucket + 1) * self.bucket_ms
+        return len(self.counts) * self.bucket_ms
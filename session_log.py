@@ -0,0 +1,189 @@
+import json
+import struct
+import sys
+import time
+from array import array
+
+from grid_config import GRID_ROWS, GRID_COLS
+
+SESSION_VERSION = 1
+
+# Event kinds
+PATTERN = 0  # A pattern was shown: tile = its stump, value = difficulty
+HIT = 1      # Press on the stump: value = points
+ROCK = 2     # Press on a rock
+EMPTY = 3    # Press on an empty tile
+
+# Binary session record: header, venue (UTF-8), then the event columns
+# (kinds B, times i, tiles h, values h), all little-endian: 9 bytes per event
+BINARY_MAGIC = b"TGS1"
+BINARY_HEADER = struct.Struct("<4sBdIHHiHHIH")  # magic, version, started, seed, rows, cols,
+                                                # score, hits, misses, events, venue length
+EVENT_COLUMNS = (("kinds", "B"), ("times", "i"), ("tiles", "h"), ("values", "h"))
+EVENT_SIZE = sum(array(code).itemsize for _, code in EVENT_COLUMNS)
+
+
+class SessionLog:
+    """
+    Everything that happened in one game, kept in flat arrays (a few bytes
+    per event, no object per event): every pattern shown and every press scored.
+
+    Times are ms since the session started, tiles are row * cols + col
+    (-1 for none).
+    """
+
+    def __init__(self, cols=GRID_COLS):
+        self.cols = cols
+        self.clear()
+
+    def clear(self, started=None):
+        """Start a new session; started is its time.perf_counter() time (now if None)."""
+        self.started = time.perf_counter() if started is None else started
+        self.started_wall = time.time()
+        self.kinds = array("B")
+        self.times = array("i")
+        self.tiles = array("h")
+        self.values = array("h")
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, kind, t, tile=None, value=0):
+        """
+        Record an event.
+
+        Args:
+            kind: PATTERN, HIT, ROCK or EMPTY
+            t: time.perf_counter() time of the event
+            tile: (row, col) or None
+            value: Difficulty of a pattern, points of a press
+        """
+        self.kinds.append(kind)
+        self.times.append(int((t - self.started) * 1000))
+        self.tiles.append(-1 if tile is None else tile[0] * self.cols + tile[1])
+        self.values.append(value)
+
+    def finish(self, score, hits, misses, seed=0, venue="", rows=GRID_ROWS):
+        """
+        Hand the session over as a dictionary and start an empty one.
+
+        The arrays are moved, not copied, so the session can be written on
+        another thread while the next game logs.
+        """
+        session = {
+            "version": SESSION_VERSION,
+            "started": self.started_wall,
+            "venue": venue,
+            "seed": seed or 0,
+            "rows": rows,
+            "cols": self.cols,
+            "score": score,
+            "hits": hits,
+            "misses": misses,
+            "kinds": self.kinds,
+            "times": self.times,
+            "tiles": self.tiles,
+            "values": self.values,
+        }
+        self.clear()
+        return session
+
+
+def append_session(path, session):
+    """
+    Append a session to a session file: binary if the name ends in .bin,
+    JSON lines otherwise. Sessions are only ever appended, one record each.
+    """
+    if str(path).endswith(".bin"):
+        data = encode_binary(session)
+        with open(path, "ab") as f:
+            f.write(data)
+    else:
+        line = json.dumps({
+            name: list(value) if isinstance(value, array) else value
+            for name, value in session.items()
+        })
+        with open(path, "a") as f:
+            f.write(line + "\n")
+
+
+def encode_binary(session):
+    venue = session["venue"].encode("utf-8")
+    parts = [
+        BINARY_HEADER.pack(
+            BINARY_MAGIC, SESSION_VERSION, session["started"], session["seed"],
+            session["rows"], session["cols"], session["score"], session["hits"],
+            session["misses"], len(session["kinds"]), len(venue),
+        ),
+        venue,
+    ]
+    for name, code in EVENT_COLUMNS:
+        column = array(code, session[name])
+        if sys.byteorder == "big":
+            column.byteswap()
+        parts.append(column.tobytes())
+    return b"".join(parts)
+
+
+def iter_sessions(path, events=True):
+    """
+    Yield the sessions of a session file (as written by append_session), one at a time.
+
+    Args:
+        events: Also read the event columns; False only reads the totals,
+                which skips the events of binary files without decoding them
+    """
+    if str(path).endswith(".bin"):
+        yield from _iter_binary(path, events)
+        return
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            session = json.loads(line)
+            if session.get("version") != SESSION_VERSION:
+                raise ValueError(f"Unsupported session version: {session.get('version')}")
+            if events:
+                for name, code in EVENT_COLUMNS:
+                    session[name] = array(code, session[name])
+            else:
+                for name, _ in EVENT_COLUMNS:
+                    del session[name]
+            yield session
+
+
+def _iter_binary(path, events):
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(BINARY_HEADER.size)
+            if len(header) < BINARY_HEADER.size:
+                return  # End of file (or a record cut short by a crash)
+            (magic, version, started, seed, rows, cols,
+             score, hits, misses, count, venue_length) = BINARY_HEADER.unpack(header)
+            if magic != BINARY_MAGIC or version != SESSION_VERSION:
+                raise ValueError(f"Not a version {SESSION_VERSION} session record at offset {f.tell() - len(header)}")
+            session = {
+                "version": version,
+                "started": started,
+                "venue": f.read(venue_length).decode("utf-8"),
+                "seed": seed,
+                "rows": rows,
+                "cols": cols,
+                "score": score,
+                "hits": hits,
+                "misses": misses,
+            }
+            if not events:
+                f.seek(count * EVENT_SIZE, 1)
+                yield session
+                continue
+            for name, code in EVENT_COLUMNS:
+                column = array(code)
+                data = f.read(count * column.itemsize)
+                if len(data) < count * column.itemsize:
+                    return
+                column.frombytes(data)
+                if sys.byteorder == "big":
+                    column.byteswap()
+                session[name] = column
+            yield session
@@ -0,0 +1,327 @@
+"""
+Headless simulation of the tile floor.
+
+VirtualFloor opens a pseudo-terminal and answers on it like arduino_sketch.ino:
+it accepts the text and binary lighting commands (including the "proto bin"
+negotiation), or only the "light" commands of old firmware, and reports presses. tile_comm connects to the pty like to a
+real board. Presses come from a script and/or simulated players.
+
+run_simulation() drives the GameEngine in game time, as fast as possible or
+at a chosen speed, and reports press-to-score latency and press throughput.
+POSIX only (needs os.openpty).
+"""
+import argparse
+import os
+import random
+import threading
+import time
+
+from tile_comm import (
+    PressEvent, encode_packet, PACKET, PACKET_SIZE, PACKET_SYNC, PACKET_LIGHT, PACKET_LIGHT_ALL,
+    PACKET_PRESS, PROTOCOL_ACK, BRIGHTNESS_LEVELS, brightness_to_pwm,
+)
+from grid_config import GRID_ROWS, GRID_COLS
+from game_states import GAME_OVER
+
+
+def load_script(path):
+    """
+    Read scripted presses, one "<time ms> <row> <col>" per line
+    (blank lines and lines starting with # are ignored).
+
+    Returns:
+        List of (time_ms, row, col) sorted by time
+    """
+    presses = []
+    with open(path) as script:
+        for line in script:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            time_ms, row, col = (int(part) for part in line.split())
+            presses.append((time_ms, row, col))
+    presses.sort()
+    return presses
+
+
+class VirtualFloor:
+    """A fake Arduino tile floor behind a pty, speaking the sketch protocol."""
+
+    bright_level = BRIGHTNESS_LEVELS["bright"]
+    debounce_ms = 300  # Same as debounceDelay in the sketch
+
+    def __init__(self, script=None, press_rate=0.0, accuracy=0.7, seed=None, rows=GRID_ROWS, cols=GRID_COLS,
+                 legacy=False):
+        """
+        Args:
+            script: List of (time_ms, row, col) presses to inject
+            press_rate: Random presses per second of game time (0 for none)
+            accuracy: Chance that a random press lands on a bright tile
+                      (stump or start cue) instead of any tile
+            seed: Seed for the random presses
+            rows, cols: Size of the grid behind this board
+            legacy: Answer like old firmware, which only knows the "light"
+                    and "light_all" commands
+        """
+        if not hasattr(os, "openpty"):
+            raise RuntimeError("The virtual floor needs a POSIX pseudo-terminal (os.openpty)")
+
+        self.rows = rows
+        self.cols = cols
+        self.total_tiles = rows * cols
+        self.script = list(script or [])
+        self.press_rate = press_rate
+        self.accuracy = accuracy
+        self.random = random.Random(seed)
+        self.legacy = legacy
+
+        self.master_fd, self.slave_fd = os.openpty()
+        self.port = os.ttyname(self.slave_fd)
+        self.write_lock = threading.Lock()
+        self.reader_thread = None
+        self.running = False
+
+        self.binary = False
+        self.levels = [0] * self.total_tiles
+        self.last_press = [None] * self.total_tiles
+        self.now_ms = 0
+        self.next_random_press = 0.0
+
+        # Real time each press was written, by (device ms, tile index)
+        self.sent = {}
+        self.presses_sent = 0
+        self.latencies = []  # Seconds from write to the game picking the press up
+
+    def start(self):
+        self.running = True
+        self.reader_thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader_thread.start()
+        self._write(b"Arduino ready.\n")
+
+    def stop(self):
+        self.running = False
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _write(self, data):
+        with self.write_lock:
+            os.write(self.master_fd, data)
+
+    def _read_loop(self):
+        """Apply the commands the game sends, like handleSerialCommands() in the sketch."""
+        buffer = bytearray()
+        while self.running:
+            try:
+                chunk = os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            if not chunk:
+                break
+            buffer += chunk
+            if self.binary:
+                self._handle_packets(buffer)
+            else:
+                self._handle_lines(buffer)
+
+    def _handle_lines(self, buffer):
+        while not self.binary:
+            end = buffer.find(b"\n")
+            if end < 0:
+                return
+            command = bytes(buffer[:end]).decode("utf-8", errors="replace").strip()
+            del buffer[:end + 1]
+
+            if self.legacy and not command.startswith("light"):
+                continue  # Old firmware ignores the commands it does not know
+            if command == "proto bin":
+                self._write(PROTOCOL_ACK + b"\n")
+                self.binary = True
+                self._handle_packets(buffer)  # Anything after the switch is binary
+            elif command.startswith("frame "):
+                data = bytes.fromhex(command[6:])
+                self.levels[:len(data)] = list(data[:self.total_tiles])
+            elif command.startswith("tiles "):
+                data = bytes.fromhex(command[6:])
+                for i in range(0, len(data) - 1, 2):
+                    if data[i] < self.total_tiles:
+                        self.levels[data[i]] = data[i + 1]
+            elif command.startswith("light_all "):
+                self.levels = [brightness_to_pwm(command[10:])] * self.total_tiles
+            elif command.startswith("light "):
+                # "light <index> <unused> <brightness>", as parsed by the sketch
+                parts = command.split(" ")
+                if len(parts) == 4 and parts[1].isdigit() and int(parts[1]) < self.total_tiles:
+                    self.levels[int(parts[1])] = brightness_to_pwm(parts[3])
+
+    def _handle_packets(self, buffer):
+        pos = 0
+        while len(buffer) - pos >= PACKET_SIZE:
+            if buffer[pos] != PACKET_SYNC:
+                pos += 1
+                continue
+            _, kind, index, value, _, checksum = PACKET.unpack_from(buffer, pos)
+            if checksum != sum(buffer[pos + 1:pos + PACKET_SIZE - 1]) & 0xFF:
+                pos += 1
+                continue
+            pos += PACKET_SIZE
+            if kind == PACKET_LIGHT and index < self.total_tiles:
+                self.levels[index] = value
+            elif kind == PACKET_LIGHT_ALL:
+                self.levels = [value] * self.total_tiles
+        del buffer[:pos]
+
+    def press(self, row, col):
+        """Report a press of tile (row, col) at the current game time, debounced like the sketch."""
+        index = row * self.cols + col
+        device_ms = self.now_ms
+        last = self.last_press[index]
+        if last is not None and device_ms - last <= self.debounce_ms:
+            return  # The sketch ignores a tile pressed again within the debounce delay
+        self.last_press[index] = device_ms
+        if self.binary:
+            data = encode_packet(PACKET_PRESS, index, 0, device_ms)
+        else:
+            data = f"pressed {row} {col} {device_ms}\n".encode("utf-8")
+        self.sent[(device_ms, index)] = time.perf_counter()
+        self.presses_sent += 1
+        self._write(data)
+
+    def advance(self, now_ms):
+        """Inject the scripted and random presses due by game time now_ms."""
+        self.now_ms = now_ms
+        while self.script and self.script[0][0] <= now_ms:
+            _, row, col = self.script.pop(0)
+            self.press(row, col)
+
+        if self.press_rate <= 0:
+            return
+        while self.next_random_press <= now_ms:
+            self.press(*self._pick_tile())
+            self.next_random_press += self.random.expovariate(self.press_rate) * 1000
+
+    def _pick_tile(self):
+        bright = [i for i, level in enumerate(self.levels) if level >= self.bright_level]
+        if bright and self.random.random() < self.accuracy:
+            index = self.random.choice(bright)
+        else:
+            index = self.random.randrange(self.total_tiles)
+        return divmod(index, self.cols)
+
+    def picked_up(self, event: PressEvent, pickup_time):
+        """Record that the game picked up a press this floor sent."""
+        if event.t_device is None:
+            return
+        key = (round(event.t_device * 1000), event.row * self.cols + event.col)
+        sent_at = self.sent.pop(key, None)
+        if sent_at is not None:
+            self.latencies.append(pickup_time - sent_at)
+
+
+class ProbedInput:
+    """Wraps the Arduino input backend and reports pickups to the floor."""
+
+    def __init__(self, backend, floor):
+        self.backend = backend
+        self.floor = floor
+
+    def handle_event(self, event):
+        self.backend.handle_event(event)
+
+    def poll(self):
+        events = self.backend.poll()
+        now = time.perf_counter()
+        for event in events:
+            self.floor.picked_up(event, now)
+        return events
+
+
+class GameCounter:
+    """Output backend counting finished games."""
+
+    def __init__(self):
+        self.games = 0
+        self.scores = []
+
+    def on_state_change(self, engine, old_state, new_state):
+        if new_state == GAME_OVER:
+            self.games += 1
+            self.scores.append(engine.tracker.score)
+
+    def render(self, engine):
+        pass
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_simulation(engine, floor, duration_ms, step_ms, speed=0.0, render_every=3):
+    """
+    Run the engine against the virtual floor for duration_ms of game time.
+
+    Args:
+        engine: GameEngine whose inputs read from the floor
+        floor: Started VirtualFloor
+        duration_ms: Game time to simulate
+        step_ms: Engine update step
+        speed: Game time per real time (0 runs as fast as possible)
+        render_every: Render once per this many steps
+
+    Returns:
+        Dictionary with the run statistics
+    """
+    counter = GameCounter()
+    engine.outputs.append(counter)
+
+    start = time.perf_counter()
+    steps = 0
+    while engine.now < duration_ms:
+        floor.advance(engine.now)
+        engine.update(step_ms)
+        steps += 1
+        if steps % render_every == 0:
+            engine.render()
+        if speed > 0:
+            ahead = engine.now / 1000 / speed - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+        elif steps % 10 == 0:
+            time.sleep(0)  # Let the serial threads run
+    real_time = time.perf_counter() - start
+
+    latencies_ms = [latency * 1000 for latency in floor.latencies]
+    return {
+        "game_seconds": engine.now / 1000,
+        "real_seconds": real_time,
+        "speedup": (engine.now / 1000) / real_time if real_time else 0.0,
+        "games_finished": counter.games,
+        "scores": counter.scores,
+        "presses_sent": floor.presses_sent,
+        "presses_received": len(floor.latencies),
+        "presses_lost": floor.presses_sent - len(floor.latencies),
+        "press_to_score_ms_p50": percentile(latencies_ms, 0.50),
+        "press_to_score_ms_p95": percentile(latencies_ms, 0.95),
+        "press_to_score_ms_max": max(latencies_ms, default=0.0),
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run the game headless against a virtual tile floor")
+    parser.add_argument("--simulate", action="store_true", help="Run the simulation (used by main.py)")
+    parser.add_argument("--duration", type=float, default=150.0, help="Seconds of game time to simulate")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Game seconds per real second (0 = as fast as possible)")
+    parser.add_argument("--press-rate", type=float, default=2.0, help="Random presses per game second")
+    parser.add_argument("--accuracy", type=float, default=0.7, help="Chance a random press hits a lit stump")
+    parser.add_argument("--script", help='File of scripted presses, "<ms> <row> <col>" per line')
+    parser.add_argument("--text-protocol", action="store_true", help="Don't negotiate the binary protocol")
+    parser.add_argument("--legacy-firmware", action="store_true",
+                        help='Simulate old firmware that only knows the "light" commands')
+    parser.add_argument("--seed", type=int, help="Seed for the random presses")
+    return parser.parse_known_args(argv)[0]
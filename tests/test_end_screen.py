@@ -0,0 +1,67 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from asset_cache import AssetCache
+from game_engine import GameEngine, UPDATE_STEP_MS
+from game_io import ScreenOutput
+from game_states import SHOWING_WIN_LOSE_TEXT
+
+
+class StubRenderer:
+    def invalidate(self):
+        pass
+
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((360, 640))
+    pygame.quit()
+
+
+def texts_drawn(assets):
+    return {text for text, _, _ in assets.texts}
+
+
+def play_to_end_screen(engine):
+    engine.start_game()
+    while not engine.active_tiles:  # Wait for the first pattern
+        engine.update(UPDATE_STEP_MS)
+    stump = next(tile for tile, kind in engine.active_tiles.items() if kind == "stump")
+    engine.tracker.check_tile_press(stump, engine.active_tiles, engine.tracker.pattern_shown_at + 0.25)
+    engine.end_game(engine.tracker.score > 0)
+    while engine.state != SHOWING_WIN_LOSE_TEXT:
+        engine.update(UPDATE_STEP_MS)
+
+
+def test_end_of_game_screen_shows_the_stats(screen):
+    assets = AssetCache()
+    output = ScreenOutput(screen, assets, StubRenderer())
+    engine = GameEngine([], [output], seed=1)
+    play_to_end_screen(engine)
+
+    output.render(engine)
+
+    drawn = texts_drawn(assets)
+    assert "YOU WIN!" in drawn
+    assert "Best streak: 1   Reaction: 255 ms" in drawn  # Upper edge of the 250-255 ms bucket
+
+
+def test_end_of_game_screen_without_hits_has_no_stats(screen):
+    assets = AssetCache()
+    output = ScreenOutput(screen, assets, StubRenderer())
+    engine = GameEngine([], [output], seed=1)
+    engine.start_game()
+    engine.end_game(False)
+    while engine.state != SHOWING_WIN_LOSE_TEXT:
+        engine.update(UPDATE_STEP_MS)
+
+    output.render(engine)
+
+    drawn = texts_drawn(assets)
+    assert "GAME OVER" in drawn
+    assert not any(text.startswith("Best streak") for text in drawn)
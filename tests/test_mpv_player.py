@@ -0,0 +1,61 @@
+import os
+import stat
+import threading
+
+import pytest
+
+from mpv_player import MpvPlayer
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="the fake mpv is a shell script")
+
+
+def fake_mpv(tmp_path, script):
+    path = tmp_path / "mpv"
+    path.write_text("#!/bin/sh\n" + script + "\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def make_player(mpv):
+    ended = []
+    done = threading.Event()
+
+    def on_clip_end(clip, reason):
+        ended.append((clip, reason))
+        done.set()
+
+    return MpvPlayer(on_clip_end=on_clip_end, mpv=mpv, ipc=False), ended, done
+
+
+def test_clip_end_is_reported_when_its_process_exits(tmp_path):
+    player, ended, done = make_player(fake_mpv(tmp_path, "sleep 0.1"))
+    assert player.start()
+    assert player.play("intro.mp4")
+    assert done.wait(5.0)
+    assert ended == [("intro.mp4", "eof")]
+    player.close()
+
+
+def test_failed_clip_is_reported_as_error(tmp_path):
+    player, ended, done = make_player(fake_mpv(tmp_path, "exit 2"))
+    player.start()
+    player.play("missing.mp4")
+    assert done.wait(5.0)
+    assert ended == [("missing.mp4", "error")]
+    player.close()
+
+
+def test_replaced_clip_is_not_reported(tmp_path):
+    player, ended, done = make_player(fake_mpv(tmp_path, "sleep 0.3"))
+    player.start()
+    player.play("intro.mp4")
+    player.play("win.mp4")
+    assert done.wait(5.0)
+    assert ended == [("win.mp4", "eof")]
+    player.close()
+
+
+def test_missing_mpv_disables_video(tmp_path):
+    player, ended, done = make_player(str(tmp_path / "no-such-mpv"))
+    assert not player.start()
+    assert not player.play("intro.mp4")
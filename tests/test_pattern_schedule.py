@@ -0,0 +1,33 @@
+import pytest
+
+from pattern_schedule import PatternSchedule
+
+
+def test_saved_schedule_loads_the_same_patterns(tmp_path):
+    schedule = PatternSchedule.generate(seed=1234)
+    path = tmp_path / "schedule.json"
+    schedule.save(path)
+
+    loaded = PatternSchedule.load(path)
+
+    assert loaded.seed == schedule.seed
+    assert loaded.game_duration == schedule.game_duration
+    assert list(loaded.times) == list(schedule.times)
+    assert list(loaded.difficulties) == list(schedule.difficulties)
+    assert loaded.patterns == schedule.patterns
+    assert loaded.grid_size == schedule.grid_size
+    assert loaded.settings == schedule.settings
+
+
+def test_same_seed_generates_the_same_schedule():
+    first = PatternSchedule.generate(seed=99)
+    second = PatternSchedule.generate(seed=99)
+    assert first.patterns == second.patterns
+    assert list(first.times) == list(second.times)
+
+
+def test_schedule_of_another_version_is_rejected():
+    data = PatternSchedule.generate(seed=1).to_dict()
+    data["version"] += 1
+    with pytest.raises(ValueError):
+        PatternSchedule.from_dict(data)
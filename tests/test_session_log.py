@@ -0,0 +1,86 @@
+from array import array
+
+import pytest
+
+from session_log import (
+    SessionLog, append_session, iter_sessions, BINARY_HEADER, EVENT_SIZE, PATTERN, HIT, ROCK, EMPTY,
+)
+
+
+def make_session(score, venue="", seed=7):
+    log = SessionLog(cols=5)
+    log.clear(started=100.0)
+    log.add(PATTERN, 100.0, (0, 1), 1)
+    log.add(HIT, 100.25, (0, 1), 2)
+    log.add(PATTERN, 103.0, (2, 4), 3)
+    log.add(ROCK, 103.5, (1, 1), -1)
+    log.add(EMPTY, 104.125, (0, 0), -1)
+    log.add(PATTERN, 106.0, None, 5)
+    return log.finish(score, hits=1, misses=2, seed=seed, venue=venue, rows=3)
+
+
+def expected_events(session):
+    return {name: list(session[name]) for name in ("kinds", "times", "tiles", "values")}
+
+
+@pytest.mark.parametrize("suffix", [".bin", ".jsonl"])
+def test_sessions_round_trip(tmp_path, suffix):
+    path = tmp_path / f"sessions{suffix}"
+    sessions = [make_session(0, venue="Zoo café", seed=1), make_session(-3, seed=2**32 - 1)]
+    for session in sessions:
+        append_session(path, {**session})
+
+    read = list(iter_sessions(path))
+
+    assert len(read) == len(sessions)
+    for got, written in zip(read, sessions):
+        for key in ("version", "started", "venue", "seed", "rows", "cols", "score", "hits", "misses"):
+            assert got[key] == written[key], key
+        assert {name: list(got[name]) for name in ("kinds", "times", "tiles", "values")} == \
+            expected_events(written)
+        assert isinstance(got["times"], array)
+
+
+def test_logged_events_are_in_ms_with_flat_tiles():
+    session = make_session(0)
+    assert list(session["kinds"]) == [PATTERN, HIT, PATTERN, ROCK, EMPTY, PATTERN]
+    assert list(session["times"]) == [0, 250, 3000, 3500, 4125, 6000]
+    assert list(session["tiles"]) == [1, 1, 14, 6, 0, -1]
+    assert list(session["values"]) == [1, 2, 3, -1, -1, 5]
+
+
+def test_binary_record_is_header_venue_and_nine_bytes_per_event(tmp_path):
+    path = tmp_path / "sessions.bin"
+    session = make_session(0, venue="ab")
+    append_session(path, session)
+    assert EVENT_SIZE == 9
+    assert path.stat().st_size == BINARY_HEADER.size + 2 + 6 * EVENT_SIZE
+
+
+@pytest.mark.parametrize("suffix", [".bin", ".jsonl"])
+def test_totals_only_skip_the_events(tmp_path, suffix):
+    path = tmp_path / f"sessions{suffix}"
+    for score in (4, 6, 8):
+        append_session(path, make_session(score))
+
+    read = list(iter_sessions(path, events=False))
+
+    assert [session["score"] for session in read] == [4, 6, 8]
+    assert all("kinds" not in session for session in read)
+
+
+def test_binary_record_cut_short_is_dropped(tmp_path):
+    path = tmp_path / "sessions.bin"
+    append_session(path, make_session(1))
+    append_session(path, make_session(2))
+    data = path.read_bytes()
+    path.write_bytes(data[:-4])  # A crash while writing the second record
+
+    assert [session["score"] for session in iter_sessions(path)] == [1]
+
+
+def test_binary_file_of_another_format_is_rejected(tmp_path):
+    path = tmp_path / "sessions.bin"
+    path.write_bytes(b"\0" * BINARY_HEADER.size)
+    with pytest.raises(ValueError):
+        list(iter_sessions(path))
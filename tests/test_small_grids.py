@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from grid_config import parse_grid_size, MIN_GRID_TILES
+from pattern_logic import MAX_DIFFICULTY, generate_pattern, validate_patterns
+from pattern_schedule import PatternSchedule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 5), (5, 1), (2, 3), (3, 2), (2, 4), (3, 3), (1, 8)])
+def test_schedule_on_small_grids(rows, cols):
+    for seed in range(20):
+        schedule = PatternSchedule.generate(seed=seed, rows=rows, cols=cols)
+        assert len(schedule) > 0
+        assert validate_patterns(schedule.patterns, schedule.difficulties, rows=rows, cols=cols) == []
+
+
+def test_generate_pattern_from_every_tile_of_a_small_grid():
+    for row in range(2):
+        for col in range(3):
+            for difficulty in range(1, MAX_DIFFICULTY + 1):
+                pattern = generate_pattern(difficulty, last_stump_pos=(row, col), rows=2, cols=3)
+                assert (row, col) not in pattern
+
+
+@pytest.mark.parametrize("text", ["1x1", "1x4", "2x2", "0x5", "17x16", "3"])
+def test_grid_sizes_the_patterns_cannot_fill_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_grid_size(text)
+
+
+def test_smallest_grid_is_accepted():
+    assert parse_grid_size(f"1x{MIN_GRID_TILES}") == (1, MIN_GRID_TILES)
+
+
+@pytest.mark.parametrize("grid", ["3x5", "6x10", "1x5"])
+def test_keyboard_can_press_the_start_tile(grid):
+    # The grid size is read at import time, so check it in a fresh interpreter
+    code = (
+        "import pygame\n"
+        "from game_engine import START_TILE\n"
+        "from game_io import KeyboardInput, START_KEYS\n"
+        "keyboard = KeyboardInput()\n"
+        "assert all(keyboard.key_tiles[key] == START_TILE for key in START_KEYS)\n"
+        "keyboard.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))\n"
+        "press, = keyboard.poll()\n"
+        "assert (press.row, press.col) == START_TILE, press\n"
+    )
+    env = dict(os.environ, TILE_GRID=grid, SDL_VIDEODRIVER="dummy")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
@@ -0,0 +1,97 @@
+import time
+
+import tile_comm
+from tile_comm import (
+    ArduinoTileController, pwm_to_percent, encode_packet, PACKET_PRESS, PACKET_LIGHT, PACKET_LIGHT_ALL,
+    PACKET_SIZE,
+)
+
+
+def make_controller():
+    return ArduinoTileController(auto_reconnect=False)
+
+
+def test_legacy_update_sends_light_commands_for_changed_tiles():
+    controller = make_controller()
+    last = [0] * tile_comm.TOTAL_TILES
+    levels = list(last)
+    levels[3] = 255
+    levels[7] = 100
+    command = controller._encode_update(levels, last, "legacy")
+    assert command == b"light 3 0 100\nlight 7 0 39\n"
+
+
+def test_legacy_uniform_frame_is_one_light_all():
+    controller = make_controller()
+    command = controller._encode_update([0] * tile_comm.TOTAL_TILES, None, "legacy")
+    assert command == b"light_all 0\n"
+
+
+def test_legacy_percentages_map_back_to_the_levels():
+    for level in tile_comm.BRIGHTNESS_LEVELS.values():
+        # The sketch maps a percentage with map(percent, 0, 100, 0, 255)
+        assert abs(pwm_to_percent(level) * 255 // 100 - level) <= 2
+
+
+def make_binary_controller():
+    controller = make_controller()
+    controller.protocol = "binary"
+    return controller
+
+
+def pressed_tiles(controller):
+    return [(event.row, event.col) for event in controller.get_press_events()]
+
+
+def test_packet_layout_matches_the_sketch():
+    # sync, type, index, value, device ms (uint32 little-endian), checksum
+    packet = encode_packet(PACKET_PRESS, 3, 0, 0x01020304)
+    assert len(packet) == PACKET_SIZE == 9
+    checksum = (0x81 + 3 + 0x04 + 0x03 + 0x02 + 0x01) & 0xFF
+    assert packet == bytes([0xA5, 0x81, 3, 0, 0x04, 0x03, 0x02, 0x01, checksum])
+
+
+def test_binary_presses_round_trip():
+    controller = make_binary_controller()
+    tiles = range(tile_comm.TOTAL_TILES)
+    data = b"".join(encode_packet(PACKET_PRESS, index, 0, 1000 + index) for index in tiles)
+    controller._handle_chunk(data, time.perf_counter())
+    events = controller.get_press_events()
+    assert [(event.row, event.col) for event in events] == [divmod(index, tile_comm.GRID_COLS) for index in tiles]
+    assert [event.t_device for event in events] == [(1000 + index) / 1000 for index in tiles]
+
+
+def test_packets_split_across_reads_are_reassembled():
+    controller = make_binary_controller()
+    data = encode_packet(PACKET_PRESS, 1, 0, 500) + encode_packet(PACKET_PRESS, 2, 0, 600)
+    for start in range(0, len(data), 4):
+        controller._handle_chunk(data[start:start + 4], time.perf_counter())
+    assert pressed_tiles(controller) == [divmod(1, tile_comm.GRID_COLS), divmod(2, tile_comm.GRID_COLS)]
+    assert controller.read_buffer == b""
+
+
+def test_corrupted_packet_is_skipped_and_the_stream_resyncs():
+    controller = make_binary_controller()
+    corrupted = bytearray(encode_packet(PACKET_PRESS, 5, 0, 1005))
+    corrupted[-1] ^= 0xFF
+    data = (b"\x00\x13garbage" + encode_packet(PACKET_PRESS, 3, 0, 1003) + bytes(corrupted)
+            + encode_packet(PACKET_PRESS, 7, 0, 1007))
+    controller._handle_chunk(data, time.perf_counter())
+    assert pressed_tiles(controller) == [divmod(3, tile_comm.GRID_COLS), divmod(7, tile_comm.GRID_COLS)]
+    assert controller.press_stats["bad_packets"] == 1
+
+
+def test_press_for_a_tile_outside_the_grid_is_ignored():
+    controller = make_binary_controller()
+    controller._handle_chunk(encode_packet(PACKET_PRESS, tile_comm.TOTAL_TILES, 0, 1), time.perf_counter())
+    assert pressed_tiles(controller) == []
+
+
+def test_binary_update_encodes_changed_tiles_as_light_packets():
+    controller = make_controller()
+    last = [0] * tile_comm.TOTAL_TILES
+    levels = list(last)
+    levels[4] = 180
+    assert controller._encode_update(levels, last, "binary") == encode_packet(PACKET_LIGHT, 4, 180)
+    assert controller._encode_update([25] * tile_comm.TOTAL_TILES, None, "binary") == \
+        encode_packet(PACKET_LIGHT_ALL, value=25)
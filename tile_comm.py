@@ -1,38 +1,226 @@
 import serial
 import serial.tools.list_ports
+import os
 import time
+import struct
 import threading
-from typing import Optional, Tuple, List
+from collections import deque
+from typing import Callable, Optional, Tuple, List, Dict, NamedTuple
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Grid dimensions of the tile floor (tile index = row * GRID_COLS + col)
+from grid_config import GRID_ROWS, GRID_COLS, TOTAL_TILES
+
+# Longest line kept while waiting for its newline
+MAX_LINE_LENGTH = 256
+
+# Serial settings: new firmware runs at DEFAULT_BAUD_RATE and can switch to the
+# binary protocol, old firmware only speaks text at FALLBACK_BAUD_RATE and only
+# knows the per-tile "light" commands (not "frame"/"tiles")
+DEFAULT_BAUD_RATE = 115200
+FALLBACK_BAUD_RATE = 9600
+PROTOCOL_REQUEST = b"proto bin\n"
+PROTOCOL_ACK = b"proto bin ok"
+PROTOCOL_TIMEOUT = 1.0  # seconds to wait for the firmware to acknowledge
+
+# The Arduino resets when its port is opened; the sketch prints this line once set up
+READY_LINE = b"Arduino ready."
+
+# Reconnecting: retry delays double from the min to the max while the board
+# is away, and the port is watched meanwhile to retry as soon as it is back
+RECONNECT_MIN_DELAY = 0.1
+RECONNECT_MAX_DELAY = 5.0
+HOTPLUG_POLL_INTERVAL = 0.25
+
+# Binary protocol: fixed-size packets of
+#   sync (0xA5), type, tile index, value, device time in ms (uint32 LE), checksum
+# where checksum is the sum of the bytes between sync and checksum, modulo 256
+PACKET = struct.Struct("<BBBBIB")
+PACKET_SIZE = PACKET.size
+PACKET_SYNC = 0xA5
+PACKET_LIGHT = 0x01      # host -> Arduino: set tile <index> to PWM <value>
+PACKET_LIGHT_ALL = 0x02  # host -> Arduino: set every tile to PWM <value>
+PACKET_PRESS = 0x81      # Arduino -> host: tile <index> pressed at <time>
+
+def encode_packet(kind: int, index: int = 0, value: int = 0, device_ms: int = 0) -> bytes:
+    """
+    Build one binary protocol packet.
+    
+    Args:
+        kind: Packet type (PACKET_LIGHT, PACKET_LIGHT_ALL, PACKET_PRESS)
+        index: Tile index
+        value: PWM level for lighting packets
+        device_ms: Arduino millis() for press packets
+        
+    Returns:
+        PACKET_SIZE bytes ready to write
+    """
+    body = PACKET.pack(PACKET_SYNC, kind, index, value, device_ms & 0xFFFFFFFF, 0)
+    checksum = sum(body[1:PACKET_SIZE - 1]) & 0xFF
+    return body[:PACKET_SIZE - 1] + bytes((checksum,))
+
+# Press events kept until the game drains them (oldest are dropped beyond this)
+MAX_PENDING_PRESSES = 256
+
+# Device timestamps: the clock offset is the smallest (arrival - device time)
+# of the last CLOCK_WINDOW seconds, so it follows clock drift. A mapped press
+# time more than MAX_PRESS_DELAY before its arrival is not trusted.
+CLOCK_WINDOW = 10.0
+MAX_PRESS_DELAY = 0.5
+
+class PressEvent(NamedTuple):
+    """A tile press reported by the Arduino."""
+    row: int
+    col: int
+    t_press: float                   # Best estimate of the press time (time.perf_counter() clock)
+    t_arrival: float                 # time.perf_counter() when the message was read
+    t_device: Optional[float] = None # Arduino millis() / 1000 if the sketch reported it
+
+# Named brightness levels, mirrored from mapBrightness() in arduino_sketch.ino
+BRIGHTNESS_LEVELS = {
+    "bright": 255,
+    "medium": 180,
+    "dim": 100,
+    "low": 25,
+    "off": 0,
+}
+
+def brightness_to_pwm(brightness) -> int:
+    """
+    Convert a brightness value to the PWM level (0-255) used by the sketch.
+    
+    Args:
+        brightness: Named level ("bright", "dim", ...), a percentage string
+                    ("0"-"100") or a PWM integer (0-255)
+        
+    Returns:
+        PWM level in the range 0-255
+    """
+    if isinstance(brightness, str):
+        name = brightness.strip().lower()
+        if name in BRIGHTNESS_LEVELS:
+            return BRIGHTNESS_LEVELS[name]
+        try:
+            percent = int(name)
+        except ValueError:
+            return 0  # Default to off for invalid values, same as the sketch
+        percent = max(0, min(100, percent))
+        return percent * 255 // 100
+    return max(0, min(255, int(brightness)))
+
+def pwm_to_percent(level: int) -> int:
+    """Convert a PWM level (0-255) to the nearest percentage (0-100) for the "light" commands."""
+    return (level * 100 + 127) // 255
+
+def find_arduino_ports() -> List[str]:
+    """
+    Find every serial port that looks like an Arduino.
+    
+    Returns:
+        Port names, sorted by name so the order is stable between runs
+    """
+    ports = []
+    for port in serial.tools.list_ports.comports():
+        # Common Arduino identifiers
+        if any(identifier in port.description.lower() for identifier in
+               ['arduino', 'usb serial', 'ch340', 'cp210x', 'ftdi']):
+            ports.append(port.device)
+    return sorted(ports)
+
 class ArduinoTileController:
     """Controller for Arduino tile communication via serial port."""
     
-    def __init__(self, baud_rate: int = 9600, timeout: float = 1.0, auto_reconnect: bool = True):
+    def __init__(self, baud_rate: int = DEFAULT_BAUD_RATE, timeout: float = 1.0, auto_reconnect: bool = True,
+                 binary_protocol: bool = True, fallback_baud_rate: int = FALLBACK_BAUD_RATE,
+                 reset_delay: float = 2.0, rows: int = GRID_ROWS, cols: int = GRID_COLS,
+                 rescan_ports: bool = True):
         """
         Initialize the Arduino tile controller.
         
         Args:
-            baud_rate: Serial communication baud rate (default: 9600)
+            baud_rate: Serial communication baud rate (default: 115200)
             timeout: Serial timeout in seconds (default: 1.0)
             auto_reconnect: Whether to automatically reconnect on connection loss (default: True)
+            binary_protocol: Negotiate the binary protocol on connect (default: True)
+            fallback_baud_rate: Baud rate for text-only firmware when negotiation fails (default: 9600)
+            reset_delay: Longest wait for the sketch's ready line after opening the port,
+                         which resets the Arduino (default: 2.0, 0 to not wait)
+            rows, cols: Size of the tile grid wired to this Arduino (default: GRID_ROWS x GRID_COLS)
+            rescan_ports: When reconnecting, look for the Arduino on other ports
+                          if the last one fails (default: True)
         """
         self.baud_rate = baud_rate
         self.timeout = timeout
         self.auto_reconnect = auto_reconnect
+        self.binary_protocol = binary_protocol
+        self.fallback_baud_rate = fallback_baud_rate
+        self.reset_delay = reset_delay
+        self.rescan_ports = rescan_ports
+        self.rows = rows
+        self.cols = cols
+        self.total_tiles = rows * cols
+        self.port: Optional[str] = None  # Port of the current or last connection
+        self.protocol = "text"  # Protocol in use on the current connection
         self.serial_connection: Optional[serial.Serial] = None
         self.is_connected = False
-        self.reconnect_thread: Optional[threading.Thread] = None
+        self.reconnect_thread: Optional[threading.Thread] = None  # Listener
+        self.supervisor_thread: Optional[threading.Thread] = None
+        self.link_up = threading.Event()
+        self.link_lost = threading.Event()
         self.should_stop = False
         
-        # Latest pressed tile data
-        self.latest_pressed_tile: Optional[Tuple[int, int]] = None
+        # Press events not yet drained by the game
+        self.press_events: deque = deque(maxlen=MAX_PENDING_PRESSES)
         self.tile_lock = threading.Lock()
         
+        # Smallest recent (arrival - device time), maps device timestamps onto our clock
+        self.device_clock_offset: Optional[float] = None
+        self.clock_samples: deque = deque()  # (arrival, offset), offsets increasing
+        self.last_device_time: Optional[float] = None
+        self.last_press_time = float("-inf")
+        
+        # Last frame sent to the Arduino (PWM per tile index), None if unknown
+        self.last_frame: Optional[List[int]] = None
+        
+        # Lighting state waiting for the writer thread. Updates for the same
+        # tile coalesce, so the queue is bounded by the number of tiles.
+        self.target_frame: List[int] = [0] * self.total_tiles
+        self.pending_tiles: set = set()
+        self.pending_since: Optional[float] = None
+        self.write_condition = threading.Condition()
+        self.writer_thread: Optional[threading.Thread] = None
+        
+        # Write counters (times in seconds internally, reported in ms)
+        self.stats_lock = threading.Lock()
+        self.write_stats: Dict[str, float] = {
+            "writes": 0,
+            "bytes": 0,
+            "total_write_time": 0.0,
+            "last_write_ms": 0.0,
+            "max_write_ms": 0.0,
+            "last_queue_ms": 0.0,
+            "max_queue_ms": 0.0,
+        }
+        
+        # Press counters: time from a press arriving on the port to the game reading it
+        self.press_stats: Dict[str, float] = {
+            "presses": 0,
+            "total_press_latency": 0.0,
+            "last_press_latency_ms": 0.0,
+            "max_press_latency_ms": 0.0,
+            "bad_packets": 0,
+        }
+        
+        # Optional callback(write_time, queue_time) after every write, on the writer thread
+        self.write_listener: Optional[Callable[[float, float], None]] = None
+        
+        # Bytes received but not yet terminated by a newline
+        self.read_buffer = bytearray()
+        
     def find_arduino_port(self) -> Optional[str]:
         """
         Find the Arduino port automatically.
@@ -40,13 +228,10 @@ class ArduinoTileController:
         Returns:
             Port name if found, None otherwise
         """
-        ports = serial.tools.list_ports.comports()
-        for port in ports:
-            # Common Arduino identifiers
-            if any(identifier in port.description.lower() for identifier in 
-                   ['arduino', 'usb serial', 'ch340', 'cp210x', 'ftdi']):
-                logger.info(f"Found Arduino on port: {port.device}")
-                return port.device
+        ports = find_arduino_ports()
+        if ports:
+            logger.info(f"Found Arduino on port: {ports[0]}")
+            return ports[0]
         return None
     
     def connect(self, port: Optional[str] = None) -> bool:
@@ -70,21 +255,38 @@ class ArduinoTileController:
                 return False
         
         try:
-            self.serial_connection = serial.Serial(
-                port=port,
-                baudrate=self.baud_rate,
-                timeout=self.timeout
-            )
+            self._open_port(port, self.baud_rate)
             
-            # Wait a moment for Arduino to reset
-            time.sleep(2)
+            if self.binary_protocol and self.serial_connection.is_open:
+                if self._negotiate_protocol():
+                    logger.info(f"Using binary protocol at {self.baud_rate} baud")
+                else:
+                    # Old firmware: "light" text commands only, at its own baud rate
+                    logger.info(f"No binary protocol reply, falling back to light commands "
+                                f"at {self.fallback_baud_rate} baud")
+                    if self.fallback_baud_rate != self.baud_rate:
+                        self.serial_connection.close()
+                        self._open_port(port, self.fallback_baud_rate)
+                    self.protocol = "legacy"
             
             if self.serial_connection.is_open:
                 self.is_connected = True
+                self.port = port
+                self.link_lost.clear()
+                self.link_up.set()
+                
+                # Arduino state is unknown after a reset, resend the whole target frame
+                with self.write_condition:
+                    self.last_frame = None
+                    self.pending_tiles.update(range(self.total_tiles))
+                    self.pending_since = time.perf_counter()
+                    self.write_condition.notify()
                 logger.info(f"Successfully connected to Arduino on {port}")
                 
-                # Start listening thread
+                # Start listening, writer and reconnect threads
                 self.start_listening()
+                self.start_writing()
+                self.start_supervisor()
                 return True
             else:
                 print('failed serial connection')
@@ -98,14 +300,97 @@ class ArduinoTileController:
             logger.error(f"Unexpected error during connection: {e}")
             return False
     
+    def _open_port(self, port: str, baud_rate: int):
+        """
+        Open the serial port in text mode and wait for the Arduino to reset.
+        
+        Args:
+            port: Serial port name
+            baud_rate: Serial communication baud rate
+        """
+        self.serial_connection = serial.Serial(
+            port=port,
+            baudrate=baud_rate,
+            timeout=self.timeout
+        )
+        self.protocol = "text"
+        self.read_buffer.clear()
+        self._reset_device_clock()  # A new link (and a reset board): resync its clock
+        
+        # Opening the port resets the Arduino: wait until the sketch is up
+        if self.reset_delay > 0 and not self._wait_for_ready(self.reset_delay):
+            logger.warning(f"No ready message from the Arduino within {self.reset_delay} s, continuing")
+    
+    def _wait_for_ready(self, timeout: float) -> bool:
+        """
+        Read from the port until the sketch prints its ready line.
+        
+        Args:
+            timeout: Longest wait in seconds
+            
+        Returns:
+            True if the ready line arrived, False on timeout
+        """
+        connection = self.serial_connection
+        read_timeout = connection.timeout
+        connection.timeout = min(0.05, timeout)
+        try:
+            received = bytearray()
+            deadline = time.perf_counter() + timeout
+            while time.perf_counter() < deadline:
+                received += connection.read(max(1, connection.in_waiting))
+                if READY_LINE in received:
+                    return True
+                del received[:-len(READY_LINE)]  # Only a partial line can matter
+            return False
+        finally:
+            connection.timeout = read_timeout
+    
+    def _negotiate_protocol(self) -> bool:
+        """
+        Ask the firmware to switch to the binary protocol.
+        
+        Runs before the listening thread reads from the port. Bytes that follow
+        the acknowledgement are kept for the listener.
+        
+        Returns:
+            True if the firmware switched to binary, False otherwise
+        """
+        self.serial_connection.reset_input_buffer()
+        self.serial_connection.write(PROTOCOL_REQUEST)
+        self.serial_connection.flush()
+        
+        received = bytearray()
+        deadline = time.perf_counter() + PROTOCOL_TIMEOUT
+        while time.perf_counter() < deadline:
+            received += self.serial_connection.read(max(1, self.serial_connection.in_waiting))
+            ack = received.find(PROTOCOL_ACK)
+            if ack >= 0:
+                end = received.find(b"\n", ack)
+                if end >= 0:
+                    self.protocol = "binary"
+                    self.read_buffer = received[end + 1:]
+                    return True
+        return False
+    
     def disconnect(self):
         """Disconnect from the Arduino."""
         self.should_stop = True
         self.is_connected = False
+        self.link_lost.set()  # Wake the supervisor
+        
+        with self.write_condition:
+            self.write_condition.notify_all()
         
         if self.reconnect_thread and self.reconnect_thread.is_alive():
             self.reconnect_thread.join(timeout=2.0)
         
+        if self.supervisor_thread and self.supervisor_thread.is_alive():
+            self.supervisor_thread.join(timeout=2.0)
+        
+        if self.writer_thread and self.writer_thread.is_alive():
+            self.writer_thread.join(timeout=2.0)
+        
         if self.serial_connection and self.serial_connection.is_open:
             try:
                 self.serial_connection.close()
@@ -115,76 +400,290 @@ class ArduinoTileController:
     
     def start_listening(self):
         """Start the listening thread for incoming messages."""
+        if self.reconnect_thread and self.reconnect_thread.is_alive():
+            return  # Reconnected from inside the running listener
         self.reconnect_thread = threading.Thread(target=self._listen_loop, daemon=True)
         self.reconnect_thread.start()
     
+    def start_supervisor(self):
+        """Start the thread that reconnects when the link drops (if auto-reconnect is on)."""
+        if not self.auto_reconnect or self.should_stop:
+            return
+        if self.supervisor_thread and self.supervisor_thread.is_alive():
+            return
+        self.supervisor_thread = threading.Thread(target=self._supervise_loop, daemon=True)
+        self.supervisor_thread.start()
+    
+    def _link_lost(self, connection: Optional[serial.Serial]):
+        """
+        Mark the link as down and close the port so it can be reopened.
+        
+        Args:
+            connection: The serial object that failed; nothing is done if it
+                        is no longer the current one (already reconnected)
+        """
+        if connection is not self.serial_connection:
+            return
+        self.is_connected = False
+        self.link_up.clear()
+        with self.write_condition:
+            self.last_frame = None  # Unknown after the Arduino resets, send the full frame
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        self.link_lost.set()
+    
+    def _supervise_loop(self):
+        """
+        Reconnect whenever the link is down: the last port first, then any
+        other Arduino port, retrying with exponential backoff. While waiting,
+        the port is watched so a replugged board is picked up at once.
+        """
+        delay = RECONNECT_MIN_DELAY
+        while not self.should_stop:
+            if self.is_connected:
+                self.link_lost.wait(0.5)
+                delay = RECONNECT_MIN_DELAY
+                continue
+            
+            started = time.perf_counter()
+            if self._reconnect():
+                logger.info(f"Reconnected on {self.port} in {time.perf_counter() - started:.2f} s")
+                continue
+            self._wait_for_port(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+    
+    def _reconnect(self) -> bool:
+        """Try the last known port, then (if rescanning) the other Arduino ports."""
+        candidates = [self.port] if self.port else []
+        if self.rescan_ports:
+            candidates += [port for port in find_arduino_ports() if port not in candidates]
+        for port in candidates:
+            if self.should_stop:
+                return False
+            logger.info(f"Attempting to reconnect on {port}...")
+            if self.connect(port):
+                return True
+        return False
+    
+    def _wait_for_port(self, delay: float):
+        """Sleep up to delay seconds, returning early when the port (re)appears."""
+        deadline = time.perf_counter() + delay
+        was_present = self._port_present()
+        while not self.should_stop:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            time.sleep(min(HOTPLUG_POLL_INTERVAL, remaining))
+            present = self._port_present()
+            if present and not was_present:
+                return  # Plugged (back) in
+            was_present = present
+    
+    def _port_present(self) -> bool:
+        """Whether the last known port exists (any Arduino port if there is none yet)."""
+        if self.port is None:
+            return self.rescan_ports and bool(find_arduino_ports())
+        if self.port.startswith("/dev/"):
+            return os.path.exists(self.port)
+        return any(port.device == self.port for port in serial.tools.list_ports.comports())
+    
     def _listen_loop(self):
         """Main listening loop for Arduino messages."""
         while not self.should_stop:
-            if not self.is_connected or not self.serial_connection:
-                if self.auto_reconnect:
-                    logger.info("Attempting to reconnect...")
-                    time.sleep(2)
-                    self.connect()
-                else:
+            connection = self.serial_connection
+            if not self.is_connected or not connection:
+                if not self.auto_reconnect:
                     break
+                # The supervisor thread reconnects, idle until it has
+                self.link_up.wait(0.5)
                 continue
             
             try:
-                if self.serial_connection.in_waiting > 0:
-                    line = self.serial_connection.readline().decode('utf-8').strip()
-                    if line:
-                        self._process_message(line)
+                # Block until at least one byte arrives (or the timeout expires),
+                # then take everything already buffered in one read
+                chunk = connection.read(1)
+                if not chunk:
+                    continue
+                waiting = connection.in_waiting
+                if waiting:
+                    chunk += connection.read(waiting)
+                self._handle_chunk(chunk, time.perf_counter())
                         
             except serial.SerialException as e:
                 logger.error(f"Serial error in listening loop: {e}")
-                self.is_connected = False
+                self._link_lost(connection)
                 if not self.auto_reconnect:
                     break
             except Exception as e:
                 logger.error(f"Unexpected error in listening loop: {e}")
                 time.sleep(0.1)
     
-    def _process_message(self, message: str):
+    def _handle_chunk(self, chunk: bytes, arrival_time: float):
+        """
+        Split received bytes into lines (or packets) and process the complete ones.
+        
+        Debug output and command echoes from the sketch ("[DEBUG] ...",
+        "[PYTHON IN] ...") are dropped on the raw bytes, before any decoding.
+        
+        Args:
+            chunk: Bytes read from the serial port
+            arrival_time: time.perf_counter() when the chunk was read
+        """
+        self.read_buffer += chunk
+        if self.protocol == "binary":
+            self._handle_packets(arrival_time)
+            return
+        
+        lines = self.read_buffer.split(b"\n")
+        self.read_buffer = lines.pop()  # Keep the incomplete tail
+        if len(self.read_buffer) > MAX_LINE_LENGTH:
+            self.read_buffer.clear()  # Garbage without newlines, e.g. wrong baud rate
+        
+        for raw_line in lines:
+            raw_line = raw_line.strip()
+            if not raw_line or raw_line.startswith(b"["):
+                continue
+            self._process_message(raw_line.decode('utf-8', errors='replace'), arrival_time)
+    
+    def _handle_packets(self, arrival_time: float):
+        """
+        Decode the complete binary packets in the read buffer.
+        
+        Bytes before a sync byte, and packets with a bad checksum, are skipped
+        one byte at a time until the stream is back in sync.
+        
+        Args:
+            arrival_time: time.perf_counter() when the bytes were read
+        """
+        buffer = self.read_buffer
+        pos = 0
+        while len(buffer) - pos >= PACKET_SIZE:
+            if buffer[pos] != PACKET_SYNC:
+                pos += 1
+                continue
+            _, kind, index, _, device_ms, checksum = PACKET.unpack_from(buffer, pos)
+            if checksum != sum(buffer[pos + 1:pos + PACKET_SIZE - 1]) & 0xFF:
+                with self.stats_lock:
+                    self.press_stats["bad_packets"] += 1
+                pos += 1
+                continue
+            pos += PACKET_SIZE
+            
+            if kind == PACKET_PRESS and index < self.total_tiles:
+                self._add_press(index // self.cols, index % self.cols, arrival_time, device_ms / 1000)
+        del buffer[:pos]
+    
+    def _process_message(self, message: str, arrival_time: Optional[float] = None):
         """
         Process incoming messages from Arduino.
         
         Args:
             message: Raw message string from Arduino
+            arrival_time: time.perf_counter() when the message was read
         """
         try:
             parts = message.split()
             if len(parts) >= 3 and parts[0].lower() == "pressed":
                 row = int(parts[1])
                 col = int(parts[2])
+                if arrival_time is None:
+                    arrival_time = time.perf_counter()
                 
-                with self.tile_lock:
-                    self.latest_pressed_tile = (row, col)
-                
-                logger.debug(f"Tile pressed: ({row}, {col})")
+                # Newer sketches append millis() at the time of the press
+                device_time = int(parts[3]) / 1000 if len(parts) >= 4 else None
+                self._add_press(row, col, arrival_time, device_time)
                 
         except (ValueError, IndexError) as e:
             logger.warning(f"Invalid message format: {message} - {e}")
         except Exception as e:
             logger.error(f"Error processing message '{message}': {e}")
     
+    def _add_press(self, row: int, col: int, arrival_time: float, device_time: Optional[float]):
+        """
+        Queue a press event for the game.
+        
+        Args:
+            row: Row coordinate (0-based)
+            col: Column coordinate (0-based)
+            arrival_time: time.perf_counter() when the press was read
+            device_time: Arduino time of the press in seconds, if reported
+        """
+        press_time = arrival_time
+        if device_time is not None:
+            mapped = self._map_device_time(arrival_time, device_time)
+            # Keep presses in order and close to their arrival, else use the arrival time
+            if self.last_press_time <= mapped and arrival_time - mapped <= MAX_PRESS_DELAY:
+                press_time = mapped
+        self.last_press_time = press_time
+        
+        with self.tile_lock:
+            self.press_events.append(PressEvent(row, col, press_time, arrival_time, device_time))
+        
+        logger.debug(f"Tile pressed: ({row}, {col})")
+    
+    def _map_device_time(self, arrival_time: float, device_time: float) -> float:
+        """
+        Map an Arduino timestamp onto the time.perf_counter() clock.
+        
+        The offset is the minimum of (arrival - device time) over the last
+        CLOCK_WINDOW seconds (the sample with the least transmission delay),
+        kept with a monotonic deque in O(1) per press.
+        """
+        if self.last_device_time is not None and device_time < self.last_device_time:
+            self._reset_device_clock()  # millis() started again: the board was reset
+        self.last_device_time = device_time
+        
+        offset = arrival_time - device_time
+        samples = self.clock_samples
+        while samples and samples[-1][1] >= offset:
+            samples.pop()
+        samples.append((arrival_time, offset))
+        while samples[0][0] < arrival_time - CLOCK_WINDOW:
+            samples.popleft()
+        self.device_clock_offset = samples[0][1]
+        return device_time + self.device_clock_offset
+    
+    def _reset_device_clock(self):
+        """Forget the device clock offset (new link or reset board)."""
+        self.device_clock_offset = None
+        self.clock_samples.clear()
+        self.last_device_time = None
+    
+    def get_press_events(self) -> List[PressEvent]:
+        """
+        Drain all press events received since the last call.
+        
+        Returns:
+            List of PressEvent in arrival order (empty if no tile was pressed)
+        """
+        with self.tile_lock:
+            events = list(self.press_events)
+            self.press_events.clear()
+        now = time.perf_counter()
+        for event in events:
+            self._record_press_latency(now - event.t_arrival)
+        return events
+    
     def get_pressed_tile(self) -> Optional[Tuple[int, int]]:
         """
-        Get the latest pressed tile coordinates.
+        Get the oldest pressed tile coordinates not read yet.
         
         Returns:
             Tuple of (row, col) if a tile was pressed, None otherwise
         """
         with self.tile_lock:
-            if self.latest_pressed_tile:
-                result = self.latest_pressed_tile
-                self.latest_pressed_tile = None  # Clear after reading
-                return result
-            return None
+            if not self.press_events:
+                return None
+            event = self.press_events.popleft()
+        self._record_press_latency(time.perf_counter() - event.t_arrival)
+        return (event.row, event.col)
     
     def light_tile(self, row: int, col: int, brightness: int) -> bool:
         """
-        Send command to light up a specific tile with brightness.
+        Queue a specific tile to light up with brightness.
         
         Args:
             row: Row coordinate (0-based)
@@ -192,58 +691,214 @@ class ArduinoTileController:
             brightness: Brightness value (0-255)
             
         Returns:
-            True if command sent successfully, False otherwise
+            True if the update was queued, False otherwise
         """
-        if not self.is_connected or not self.serial_connection:
-            logger.error("Not connected to Arduino")
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            logger.error(f"Tile ({row}, {col}) is outside the grid")
             return False
+        return self._queue_levels({row * self.cols + col: brightness_to_pwm(brightness)})
+    
+    def light_all_tiles(self, color: str) -> bool:
+        """
+        Queue all tiles to light up with the same color.
         
-        try:
-            index = row * 5 + col
-            command = f"light {index} {brightness}\n"
-            print(command)
-            self.serial_connection.write(command.encode('utf-8'))
-            self.serial_connection.flush()
-            logger.debug(f"Sent command: {command.strip()}")
-            return True
+        Args:
+            color: Color name for all tiles
             
-        except serial.SerialException as e:
-            logger.error(f"Serial error sending command: {e}")
-            self.is_connected = False
-            return False
-        except Exception as e:
-            logger.error(f"Error sending command: {e}")
+        Returns:
+            True if the update was queued, False otherwise
+        """
+        level = brightness_to_pwm(color)
+        return self._queue_levels({index: level for index in range(self.total_tiles)})
+    
+    def light_frame(self, frame) -> bool:
+        """
+        Queue the brightness of the whole grid.
+        
+        The writer thread sends it as a single message: only the tiles that
+        differ from the last frame sent ("tiles" command), or the full grid if
+        nothing is known about the Arduino state yet or most tiles changed
+        ("frame" command). Both carry two hex digits per value, see
+        arduino_sketch.ino.
+        
+        Args:
+            frame: rows x cols nested sequence of brightness values
+                   (names, percentage strings or PWM integers)
+            
+        Returns:
+            True if the frame was queued, False otherwise
+        """
+        levels = [brightness_to_pwm(value) for row in frame for value in row]
+        if len(levels) != self.total_tiles:
+            logger.error(f"Frame has {len(levels)} tiles, expected {self.total_tiles}")
             return False
+        return self._queue_levels(dict(enumerate(levels)))
     
-    def light_all_tiles(self, color: str) -> bool:
+    def _queue_levels(self, levels: Dict[int, int]) -> bool:
         """
-        Light up all tiles with the same color.
+        Merge tile levels into the pending state and wake the writer thread.
+        
+        Newer levels replace older pending ones for the same tile, so the
+        pending state never holds more than one entry per tile.
         
         Args:
-            color: Color name for all tiles
+            levels: Mapping of tile index to PWM level
             
         Returns:
-            True if command sent successfully, False otherwise
+            True if queued, False if not connected (the levels are still kept
+            and sent once the link is back)
         """
+        with self.write_condition:
+            for index, level in levels.items():
+                if self.target_frame[index] != level:
+                    self.target_frame[index] = level
+                    self.pending_tiles.add(index)
+            if self.pending_tiles:
+                if self.pending_since is None:
+                    self.pending_since = time.perf_counter()
+                self.write_condition.notify()
+        
         if not self.is_connected or not self.serial_connection:
-            logger.error("Not connected to Arduino")
+            logger.debug("Not connected to Arduino, lighting kept for the reconnect")
             return False
+        return True
+    
+    def _encode_update(self, levels: List[int], last_frame: Optional[List[int]],
+                       protocol: str) -> Optional[bytes]:
+        """
+        Encode the difference between the last frame sent and levels.
         
-        try:
-            command = f"light_all {color.lower()}\n"
-            print(command)
-            self.serial_connection.write(command.encode('utf-8'))
-            self.serial_connection.flush()
-            logger.debug(f"Sent command: {command.strip()}")
-            return True
+        Args:
+            levels: Target PWM level per tile index
+            last_frame: Levels last sent, None if unknown (the whole frame is sent)
+            protocol: Protocol of the connection: "binary", "text" ("frame" and
+                      "tiles" commands) or "legacy" (per-tile "light" commands)
             
-        except serial.SerialException as e:
-            logger.error(f"Serial error sending command: {e}")
-            self.is_connected = False
-            return False
-        except Exception as e:
-            logger.error(f"Error sending command: {e}")
-            return False
+        Returns:
+            Bytes to write in that protocol, or None if nothing changed
+        """
+        if last_frame is None:
+            changed = list(range(self.total_tiles))
+        else:
+            changed = [i for i in range(self.total_tiles) if levels[i] != last_frame[i]]
+        
+        if not changed:
+            return None
+        
+        if protocol == "binary":
+            if len(changed) == self.total_tiles and len(set(levels)) == 1:
+                return encode_packet(PACKET_LIGHT_ALL, value=levels[0])
+            return b"".join(encode_packet(PACKET_LIGHT, i, levels[i]) for i in changed)
+        
+        if protocol == "legacy":
+            # Percentages, which every version of mapBrightness() parses
+            if len(changed) == self.total_tiles and len(set(levels)) == 1:
+                return f"light_all {pwm_to_percent(levels[0])}\n".encode('utf-8')
+            return "".join(f"light {i} 0 {pwm_to_percent(levels[i])}\n" for i in changed).encode('utf-8')
+        
+        # A diff entry costs 4 hex digits against 2 for a full frame entry
+        if len(changed) * 2 >= self.total_tiles:
+            command = "frame " + "".join(f"{level:02x}" for level in levels) + "\n"
+        else:
+            command = "tiles " + "".join(f"{i:02x}{levels[i]:02x}" for i in changed) + "\n"
+        return command.encode('utf-8')
+    
+    def start_writing(self):
+        """Start the writer thread that drains queued lighting updates."""
+        if self.writer_thread and self.writer_thread.is_alive():
+            return
+        self.writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer_thread.start()
+    
+    def _write_loop(self):
+        """Writer loop: send the pending tile state whenever it changes."""
+        while not self.should_stop:
+            with self.write_condition:
+                while not self.pending_tiles and not self.should_stop:
+                    self.write_condition.wait(timeout=0.5)
+                if self.should_stop:
+                    break
+                if not self.is_connected or not self.serial_connection:
+                    # Keep the target state for when the link comes back
+                    self.write_condition.wait(timeout=0.5)
+                    continue
+                # Snapshot the link state; encode and write outside the lock
+                connection = self.serial_connection
+                last_frame = self.last_frame
+                protocol = self.protocol
+                levels = list(self.target_frame)
+                queued_at = self.pending_since
+                self.pending_tiles.clear()
+                self.pending_since = None
+            
+            command = self._encode_update(levels, last_frame, protocol)
+            if command is None:
+                continue
+            
+            try:
+                start = time.perf_counter()
+                connection.write(command)
+                connection.flush()
+                end = time.perf_counter()
+                with self.write_condition:
+                    # A reconnect meanwhile reset last_frame for the new link, keep that
+                    if connection is self.serial_connection:
+                        self.last_frame = levels
+                self._record_write(len(command), end - start, end - (queued_at or start))
+                logger.debug(f"Sent {len(command)} bytes")
+                
+            except serial.SerialException as e:
+                logger.error(f"Serial error sending command: {e}")
+                self._link_lost(connection)  # The full frame is resent once reconnected
+            except Exception as e:
+                logger.error(f"Error sending command: {e}")
+                with self.write_condition:
+                    self.last_frame = None
+    
+    def _record_write(self, num_bytes: int, write_time: float, queue_time: float):
+        """Update the write counters after a successful write."""
+        with self.stats_lock:
+            self.write_stats["writes"] += 1
+            self.write_stats["bytes"] += num_bytes
+            self.write_stats["total_write_time"] += write_time
+            self.write_stats["last_write_ms"] = write_time * 1000
+            self.write_stats["max_write_ms"] = max(self.write_stats["max_write_ms"], write_time * 1000)
+            self.write_stats["last_queue_ms"] = queue_time * 1000
+            self.write_stats["max_queue_ms"] = max(self.write_stats["max_queue_ms"], queue_time * 1000)
+        if self.write_listener is not None:
+            self.write_listener(write_time, queue_time)
+    
+    def _record_press_latency(self, latency: float):
+        """Update the press counters with the time from arrival to pickup."""
+        with self.stats_lock:
+            self.press_stats["presses"] += 1
+            self.press_stats["total_press_latency"] += latency
+            self.press_stats["last_press_latency_ms"] = latency * 1000
+            self.press_stats["max_press_latency_ms"] = max(
+                self.press_stats["max_press_latency_ms"], latency * 1000
+            )
+    
+    def get_link_stats(self) -> Dict[str, float]:
+        """
+        Get serial link counters, useful to spot backpressure at runtime.
+        
+        Returns:
+            Dictionary with queue_depth (tiles waiting to be sent), writes,
+            bytes, avg/last/max write time, last/max time spent queued, and
+            presses with avg/last/max time from serial arrival to pickup (ms)
+        """
+        with self.write_condition:
+            queue_depth = len(self.pending_tiles)
+        with self.stats_lock:
+            stats = dict(self.write_stats)
+            stats.update(self.press_stats)
+        write_time = stats.pop("total_write_time")
+        press_latency = stats.pop("total_press_latency")
+        stats["avg_write_ms"] = (write_time * 1000 / stats["writes"]) if stats["writes"] else 0.0
+        stats["avg_press_latency_ms"] = (press_latency * 1000 / stats["presses"]) if stats["presses"] else 0.0
+        stats["queue_depth"] = queue_depth
+        return stats
+    
     
     def turn_off_all_tiles(self) -> bool:
         """
@@ -263,30 +918,352 @@ class ArduinoTileController:
         """
         return bool(self.is_connected and self.serial_connection and self.serial_connection.is_open)
 
+
+def split_floor(num_boards: int, rows: int = GRID_ROWS, cols: int = GRID_COLS) -> List[Tuple[int, int, int, int]]:
+    """
+    Split the floor into num_boards regions of whole rows (of whole columns
+    if there are fewer rows than boards), as evenly as possible.
+    
+    Returns:
+        List of (first row, first col, rows, cols) regions, top to bottom (left to right)
+    """
+    along_rows = num_boards <= rows
+    length = rows if along_rows else cols
+    if not 1 <= num_boards <= length:
+        raise ValueError(f"Cannot split a {rows}x{cols} floor between {num_boards} boards")
+    
+    regions = []
+    start = 0
+    for i in range(num_boards):
+        size = length // num_boards + (1 if i < length % num_boards else 0)
+        regions.append((start, 0, size, cols) if along_rows else (0, start, rows, size))
+        start += size
+    return regions
+
+class ArduinoTilePool:
+    """
+    Several Arduinos driving one floor, each wired to a rectangular region of it.
+    
+    Offers the ArduinoTileController interface in floor coordinates. Lighting
+    is split per board and queued on each board's own writer thread, so the
+    boards are written in parallel. Presses from every board come back in one
+    stream, in floor coordinates, ordered by press time. Each board has its
+    own listener and reconnects on its own; the others keep running.
+    """
+    
+    def __init__(self, boards: List[Tuple[Optional[str], Tuple[int, int, int, int]]],
+                 rows: int = GRID_ROWS, cols: int = GRID_COLS, **controller_args):
+        """
+        Initialize the pool.
+        
+        Args:
+            boards: (port, (first row, first col, rows, cols)) per board. The
+                    regions must cover the floor without overlapping; each
+                    board's sketch is built for the size of its region.
+            rows, cols: Size of the whole floor
+            controller_args: Passed on to every ArduinoTileController
+        """
+        self.rows = rows
+        self.cols = cols
+        self.boards: List[Tuple[Optional[str], Tuple[int, int, int, int], ArduinoTileController]] = []
+        
+        covered = [[False] * cols for _ in range(rows)]
+        for port, region in boards:
+            row0, col0, region_rows, region_cols = region
+            for row in range(row0, row0 + region_rows):
+                for col in range(col0, col0 + region_cols):
+                    if not (0 <= row < rows and 0 <= col < cols) or covered[row][col]:
+                        raise ValueError(f"Region {region} of {port} overlaps another or leaves the floor")
+                    covered[row][col] = True
+            # Each board only ever reconnects on its own port
+            controller = ArduinoTileController(rows=region_rows, cols=region_cols, rescan_ports=False,
+                                               **controller_args)
+            self.boards.append((port, tuple(region), controller))
+        if not all(all(row) for row in covered):
+            raise ValueError("The board regions do not cover the whole floor")
+        
+        # Presses merged from the boards, not read by get_pressed_tile() yet
+        self.merged_presses: deque = deque(maxlen=MAX_PENDING_PRESSES)
+    
+    @property
+    def write_listener(self) -> Optional[Callable[[float, float], None]]:
+        return self.boards[0][2].write_listener if self.boards else None
+    
+    @write_listener.setter
+    def write_listener(self, listener: Optional[Callable[[float, float], None]]):
+        for _, _, controller in self.boards:
+            controller.write_listener = listener
+    
+    def connect(self, wait: bool = True) -> bool:
+        """
+        Connect every board, in parallel (each one waits for its Arduino to reset).
+        
+        Boards that fail to connect keep retrying in the background if
+        auto-reconnect is enabled, only the failed board's lighting waits.
+        
+        Args:
+            wait: Wait for the boards; if False they connect on their
+                  reconnect threads (requires auto-reconnect)
+        
+        Returns:
+            True if every board connected (or started in the background), False otherwise
+        """
+        if not wait:
+            for port, _, controller in self.boards:
+                controller.port = port
+                controller.start_supervisor()
+            return True
+        
+        results = [False] * len(self.boards)
+        
+        def connect_board(i: int):
+            port, _, controller = self.boards[i]
+            results[i] = controller.connect(port)
+        
+        threads = [threading.Thread(target=connect_board, args=(i,), daemon=True) for i in range(len(self.boards))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for (port, region, controller), connected in zip(self.boards, results):
+            if not connected:
+                logger.error(f"Board on {port} (region {region}) did not connect")
+                if port is not None:
+                    controller.port = port
+                    controller.start_supervisor()
+        return all(results)
+    
+    def disconnect(self):
+        """Disconnect every board."""
+        for _, _, controller in self.boards:
+            controller.disconnect()
+    
+    def get_press_events(self) -> List[PressEvent]:
+        """
+        Drain the presses of every board.
+        
+        Returns:
+            List of PressEvent in floor coordinates, ordered by press time
+        """
+        events = list(self.merged_presses)
+        self.merged_presses.clear()
+        for _, (row0, col0, _, _), controller in self.boards:
+            for event in controller.get_press_events():
+                events.append(event._replace(row=event.row + row0, col=event.col + col0))
+        events.sort(key=lambda event: event.t_press)
+        return events
+    
+    def get_pressed_tile(self) -> Optional[Tuple[int, int]]:
+        """
+        Get the oldest pressed tile not read yet, in floor coordinates.
+        
+        Returns:
+            Tuple of (row, col) if a tile was pressed, None otherwise
+        """
+        if not self.merged_presses:
+            self.merged_presses.extend(self.get_press_events())
+        if not self.merged_presses:
+            return None
+        event = self.merged_presses.popleft()
+        return (event.row, event.col)
+    
+    def _board_at(self, row: int, col: int) -> Optional[Tuple[Tuple[int, int, int, int], ArduinoTileController]]:
+        for _, region, controller in self.boards:
+            row0, col0, region_rows, region_cols = region
+            if row0 <= row < row0 + region_rows and col0 <= col < col0 + region_cols:
+                return region, controller
+        return None
+    
+    def light_tile(self, row: int, col: int, brightness: int) -> bool:
+        """
+        Queue a tile of the floor to light up with brightness.
+        
+        Returns:
+            True if the update was queued, False otherwise
+        """
+        board = self._board_at(row, col)
+        if board is None:
+            logger.error(f"Tile ({row}, {col}) is outside the grid")
+            return False
+        (row0, col0, _, _), controller = board
+        return controller.light_tile(row - row0, col - col0, brightness)
+    
+    def light_all_tiles(self, color: str) -> bool:
+        """
+        Queue all tiles of every board to light up with the same color.
+        
+        Returns:
+            True if queued on every board, False otherwise
+        """
+        results = [controller.light_all_tiles(color) for _, _, controller in self.boards]
+        return all(results)
+    
+    def light_frame(self, frame) -> bool:
+        """
+        Queue the brightness of the whole floor, split into one frame per board.
+        
+        Args:
+            frame: rows x cols nested sequence of brightness values
+            
+        Returns:
+            True if queued on every board, False otherwise
+        """
+        if len(frame) != self.rows or any(len(row) != self.cols for row in frame):
+            logger.error(f"Frame is not {self.rows}x{self.cols}")
+            return False
+        results = []
+        for _, (row0, col0, region_rows, region_cols), controller in self.boards:
+            region_frame = [row[col0:col0 + region_cols] for row in frame[row0:row0 + region_rows]]
+            results.append(controller.light_frame(region_frame))
+        return all(results)
+    
+    def get_link_stats(self) -> Dict[str, float]:
+        """
+        Get the serial link counters summed over the boards.
+        
+        Returns:
+            Dictionary with the ArduinoTileController.get_link_stats() keys
+            (totals, maxima and press-weighted averages) plus boards and
+            boards_connected
+        """
+        per_board = [controller.get_link_stats() for _, _, controller in self.boards]
+        stats: Dict[str, float] = {
+            "boards": len(self.boards),
+            "boards_connected": sum(controller.is_arduino_connected() for _, _, controller in self.boards),
+        }
+        for key in ("writes", "bytes", "presses", "bad_packets", "queue_depth"):
+            stats[key] = sum(board[key] for board in per_board)
+        for key in ("max_write_ms", "max_queue_ms", "max_press_latency_ms"):
+            stats[key] = max((board[key] for board in per_board), default=0.0)
+        stats["avg_write_ms"] = (
+            sum(board["avg_write_ms"] * board["writes"] for board in per_board) / stats["writes"]
+            if stats["writes"] else 0.0
+        )
+        stats["avg_press_latency_ms"] = (
+            sum(board["avg_press_latency_ms"] * board["presses"] for board in per_board) / stats["presses"]
+            if stats["presses"] else 0.0
+        )
+        return stats
+    
+    def turn_off_all_tiles(self) -> bool:
+        """
+        Turn off all tiles of every board.
+        
+        Returns:
+            True if queued on every board, False otherwise
+        """
+        return self.light_all_tiles("off")
+    
+    def is_arduino_connected(self) -> bool:
+        """
+        Check if every board is connected.
+        
+        Returns:
+            True if all boards are connected, False otherwise
+        """
+        return all(controller.is_arduino_connected() for _, _, controller in self.boards)
+
 # Global instance for easy access
-_arduino_controller: Optional[ArduinoTileController] = None
+_arduino_controller = None  # ArduinoTileController, or ArduinoTilePool for several boards
 
-def initialize_arduino(port: Optional[str] = None, baud_rate: int = 9600) -> bool:
+def initialize_arduino(port: Optional[str] = None, baud_rate: int = DEFAULT_BAUD_RATE,
+                       binary_protocol: bool = True, reset_delay: float = 2.0,
+                       background: bool = False) -> bool:
     """
     Initialize the Arduino connection.
     
+    The binary protocol is negotiated on connect; firmware that does not
+    answer is driven with text commands at FALLBACK_BAUD_RATE.
+    
     Args:
         port: Serial port name (None for auto-detect)
         baud_rate: Serial baud rate
+        binary_protocol: Whether to try the binary protocol
+        reset_delay: Longest wait for the Arduino to report ready after opening the port
+        background: Connect on the reconnect thread instead of waiting here;
+                    lighting queued meanwhile is sent once the link is up
         
     Returns:
-        True if initialization successful, False otherwise
+        True if initialization successful (or started in the background), False otherwise
+    """
+    global _arduino_controller
+    
+    if _arduino_controller is None:
+        _arduino_controller = ArduinoTileController(
+            baud_rate=baud_rate, binary_protocol=binary_protocol, reset_delay=reset_delay
+        )
+    
+    if background and _arduino_controller.auto_reconnect:
+        _arduino_controller.port = port
+        _arduino_controller.start_supervisor()
+        return True
+    
+    connected = _arduino_controller.connect(port)
+    if not connected:
+        # Keep trying in the background: the floor may be plugged in later
+        _arduino_controller.port = port
+        _arduino_controller.start_supervisor()
+    return connected
+
+def initialize_arduino_pool(ports: Optional[List[str]] = None,
+                            regions: Optional[List[Tuple[int, int, int, int]]] = None,
+                            baud_rate: int = DEFAULT_BAUD_RATE, binary_protocol: bool = True,
+                            reset_delay: float = 2.0, background: bool = False) -> bool:
+    """
+    Initialize a floor driven by several Arduinos.
+    
+    Args:
+        ports: Serial port of each board (None to use every Arduino found,
+               in port name order)
+        regions: (first row, first col, rows, cols) of each board (None to
+                 split the floor into equal bands of rows, see split_floor)
+        baud_rate: Serial baud rate
+        binary_protocol: Whether to try the binary protocol
+        reset_delay: Longest wait for the Arduinos to report ready after opening the ports
+        background: Connect on the boards' reconnect threads instead of waiting here
+        
+    Returns:
+        True if every board connected (or started in the background), False otherwise
+    """
+    global _arduino_controller
+    
+    if ports is None:
+        ports = find_arduino_ports()
+    if not ports:
+        logger.error("No Arduino port found")
+        return False
+    if regions is None:
+        regions = split_floor(len(ports))
+    if len(regions) != len(ports):
+        logger.error(f"{len(ports)} ports for {len(regions)} regions")
+        return False
+    
+    if _arduino_controller is None:
+        _arduino_controller = ArduinoTilePool(
+            list(zip(ports, regions)),
+            baud_rate=baud_rate, binary_protocol=binary_protocol, reset_delay=reset_delay,
+        )
+    
+    return _arduino_controller.connect(wait=not background)
+
+def get_press_events() -> List[PressEvent]:
+    """
+    Drain all press events received since the last call.
+    
+    Returns:
+        List of PressEvent in arrival order
     """
     global _arduino_controller
     
     if _arduino_controller is None:
-        _arduino_controller = ArduinoTileController(baud_rate=baud_rate)
+        return []
     
-    return _arduino_controller.connect(port)
+    return _arduino_controller.get_press_events()
 
 def get_pressed_tile() -> Optional[Tuple[int, int]]:
     """
-    Get the latest pressed tile coordinates.
+    Get the oldest pressed tile coordinates not read yet.
     
     Returns:
         Tuple of (row, col) if a tile was pressed, None otherwise
@@ -319,11 +1296,60 @@ def light_tile(row: int, col: int, brightness: int) -> bool:
     
     return _arduino_controller.light_tile(row, col, brightness)
 
+def light_frame(frame) -> bool:
+    """
+    Light the whole grid from a frame of brightness values.
+    
+    Args:
+        frame: GRID_ROWS x GRID_COLS nested sequence of brightness values
+        
+    Returns:
+        True if the frame was sent (or nothing changed), False otherwise
+    """
+    global _arduino_controller
+    
+    if _arduino_controller is None:
+        logger.error("Arduino not initialized. Call initialize_arduino() first.")
+        return False
+    
+    return _arduino_controller.light_frame(frame)
+
+def get_link_stats() -> Dict[str, float]:
+    """
+    Get the serial link counters of the Arduino controller.
+    
+    Returns:
+        Dictionary of counters, empty if not initialized
+    """
+    global _arduino_controller
+    
+    if _arduino_controller is None:
+        return {}
+    
+    return _arduino_controller.get_link_stats()
+
+def set_write_listener(listener: Optional[Callable[[float, float], None]]) -> bool:
+    """
+    Set a callback receiving (write_time, queue_time) in seconds after every
+    serial write. It runs on the writer thread and must be quick.
+    
+    Returns:
+        True if set, False if not initialized
+    """
+    global _arduino_controller
+    
+    if _arduino_controller is None:
+        return False
+    
+    _arduino_controller.write_listener = listener
+    return True
+
 def cleanup():
     """Clean up Arduino connection."""
     global _arduino_controller
     
     if _arduino_controller:
+        logger.info(f"Serial link stats: {_arduino_controller.get_link_stats()}")
         _arduino_controller.disconnect()
         _arduino_controller = None
 
@@ -1,62 +1,142 @@
 import pygame
 
+from grid_config import GRID_ROWS, GRID_COLS
+
+
+class GridLayout:
+    """
+    Geometry of the tile grid for one surface size: tile rects with a 3:2
+    aspect ratio, centered horizontally and aligned to the top.
+    Shared by drawing and by mouse/touch hit testing.
+    """
+
+    def __init__(self, width, height, rows=GRID_ROWS, cols=GRID_COLS, padding=15):
+        """
+        Args:
+            width, height: Size of the surface the grid is drawn on
+            rows, cols: Grid dimensions
+            padding: Space around and between tiles in pixels
+        """
+        self.size = (width, height)
+        self.rows = rows
+        self.cols = cols
+        self.padding = padding
+
+        # Calculate total available space for tiles, excluding padding from all sides
+        available_width = width - (padding * 2)
+        available_height = height - (padding * 2)
+
+        # Calculate tile dimensions based on a 3:2 aspect ratio, considering padding between tiles
+        h_from_width = (available_width - (cols - 1) * padding) / (cols * 1.5)
+        h_from_height = (available_height - (rows - 1) * padding) / rows
+
+        tile_height = min(h_from_width, h_from_height)
+        if tile_height < 0: tile_height = 0
+        tile_width = tile_height * 1.5
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+
+        # Calculate starting position to align grid to the top
+        grid_content_width = cols * tile_width + (cols - 1) * padding
+        self.start_x = (width - grid_content_width) / 2
+        self.start_y = padding # Align to top with a small padding
+
+        self.step_x = tile_width + padding
+        self.step_y = tile_height + padding
+
+        # Prebuilt rects, indexed by (row, col)
+        self.rects = {
+            (row, col): pygame.Rect(
+                self.start_x + col * self.step_x,
+                self.start_y + row * self.step_y,
+                tile_width,
+                tile_height,
+            )
+            for row in range(rows)
+            for col in range(cols)
+        }
+
+    def tile_at(self, x, y):
+        """
+        Return the (row, col) of the tile under point (x, y) in surface
+        coordinates, or None if the point is outside every tile.
+        """
+        if self.step_x <= 0 or self.step_y <= 0:
+            return None
+        col = int((x - self.start_x) // self.step_x)
+        row = int((y - self.start_y) // self.step_y)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        # The point may be in the padding after the tile
+        if self.rects[(row, col)].collidepoint(x, y):
+            return (row, col)
+        return None
+
+
+_layouts = {}
+
+def get_grid_layout(size, rows=GRID_ROWS, cols=GRID_COLS):
+    """Return the GridLayout for a surface size, computing it once per size."""
+    key = (tuple(size), rows, cols)
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = GridLayout(size[0], size[1], rows, cols)
+        _layouts[key] = layout
+    return layout
+
+# Color mapping with brown stumps and dark grey rocks
+TILE_COLORS = {
+    "default": (160, 160, 160),  # Darker gray (unlit)
+    "stump": (139, 69, 19),      # Brown (safe)
+    "rock": (64, 64, 64),        # Dark grey for rocks (obstacle)
+    "cue": (205, 133, 63),       # Orange-brown for the cue tile
+}
+CORNER_RADIUS = 15
+CORNER_KEY = (255, 0, 255)  # Colorkey for the cut-off corners, in no tile color
+
+# Pre-rendered tiles by (state, size)
+_tile_sprites = {}
+
+def get_tile_sprite(tile_type, size):
+    """
+    Return the rounded-rect sprite for a tile state and size, rendering it on
+    first use. Unknown states use the default color.
+
+    Sprites are opaque, in the display format once a display exists, with
+    the corners cut out by an RLE colorkey: blitting one is a run-length
+    copy, no per-pixel alpha blending.
+    """
+    key = (tile_type, tuple(size))
+    sprite = _tile_sprites.get(key)
+    if sprite is None:
+        color = TILE_COLORS.get(tile_type, TILE_COLORS["default"])
+        sprite = pygame.Surface(size)
+        sprite.fill(CORNER_KEY)
+        pygame.draw.rect(sprite, color, sprite.get_rect(), border_radius=CORNER_RADIUS)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.set_colorkey(CORNER_KEY, pygame.RLEACCEL)
+        _tile_sprites[key] = sprite
+    return sprite
+
 def draw_tile_grid(screen, active_tiles):
     """
-    Draw a 3x5 grid of tiles with a 3:2 aspect ratio using light gray colors,
-    centered on the provided screen surface.
+    Draw the GRID_ROWS x GRID_COLS grid of tiles with a 3:2 aspect ratio using
+    light gray colors, centered on the provided screen surface.
+
+    Each tile is one blit of its pre-rendered sprite; only the tile rects
+    are touched, never the padding around them.
 
     Args:
         screen: Pygame screen surface
         active_tiles: Dictionary with keys (row, col) and values as strings:
                       "stump" (safe), "rock" (obstacle)
     """
-    screen_width, screen_height = screen.get_size()
-
-    rows, cols = 3, 5
-    padding = 15  # Reduced padding to bring tiles closer
-
-    # Calculate total available space for tiles, excluding padding from all sides
-    available_width = screen_width - (padding * 2)
-    available_height = screen_height - (padding * 2)
-
-    # Calculate tile dimensions based on a 3:2 aspect ratio, considering padding between tiles
-    h_from_width = (available_width - (cols - 1) * padding) / (cols * 1.5)
-    h_from_height = (available_height - (rows - 1) * padding) / rows
-    
-    tile_height = min(h_from_width, h_from_height)
-    if tile_height < 0: tile_height = 0
-    tile_width = tile_height * 1.5
-    
-    # Color mapping with brown stumps and dark grey rocks
-    colors = {
-        "default": (160, 160, 160),  # Darker gray (unlit)
-        "stump": (139, 69, 19),      # Brown (safe)
-        "rock": (64, 64, 64),        # Dark grey for rocks (obstacle)
-        "cue": (205, 133, 63),       # Orange-brown for the cue tile
-    }
-
-    corner_radius = 15
-
-    # Calculate starting position to align grid to the top
-    grid_content_width = cols * tile_width + (cols - 1) * padding
-    grid_content_height = rows * tile_height + (rows - 1) * padding
-    start_x = (screen_width - grid_content_width) / 2
-    start_y = padding # Align to top with a small padding
-
-    for row in range(rows):
-        for col in range(cols):
-            x = start_x + col * (tile_width + padding)
-            y = start_y + row * (tile_height + padding)
-
-            tile_type = active_tiles.get((row, col), None)
-            if tile_type == "stump":
-                color = colors["stump"]
-            elif tile_type == "rock":
-                color = colors["rock"]
-            elif tile_type == "cue":
-                color = colors["cue"]
-            else:
-                color = colors["default"]
-
-            tile_rect = pygame.Rect(x, y, tile_width, tile_height)
-            pygame.draw.rect(screen, color, tile_rect, border_radius=corner_radius)
\ No newline at end of file
+    layout = get_grid_layout(screen.get_size())
+    sprites = _tile_sprites
+    blits = []
+    for position, tile_rect in layout.rects.items():
+        tile_type = active_tiles.get(position, "default")
+        sprite = sprites.get((tile_type, tile_rect.size)) or get_tile_sprite(tile_type, tile_rect.size)
+        blits.append((sprite, tile_rect))
+    screen.blits(blits, doreturn=False)